@@ -2,32 +2,38 @@
 
 import random
 from search import Search
+from parallel import ParallelSearch
+from move import get_move_notation
 
 # Agent that chooses moves randomly.
 class AgentRandom:
     def __init__(self):
         return
 
-    # Choose move from a list of legal moves
-    def ChooseMove(self, state, current_player, opposing_player):
-        result = ""
+    # Choose move from a list of legal moves (no time limit needed)
+    def ChooseMove(self, state, current_player, opposing_player, time_limit=None):
+        result = None
         # Get legal moves
-        legal_moves = state.GetPlayersLegalMoves(current_player, opposing_player)
+        legal_moves = state.GetGameStatus()["legal_moves"]
         # Check that there is at least one legal move
         if legal_moves:
             result = random.choice(legal_moves)
         return result
 
+    # Release resources (nothing to release)
+    def Close(self):
+        return
+
 # Agent that always captures if possible.
 class AgentCapture:
     def __init__(self):
         return
 
-    # Choose move from a list of legal moves
-    def ChooseMove(self, state, current_player, opposing_player):
-        result = ""
+    # Choose move from a list of legal moves (no time limit needed)
+    def ChooseMove(self, state, current_player, opposing_player, time_limit=None):
+        result = None
         # Get legal moves and captures
-        legal_moves     = state.GetPlayersLegalMoves(current_player, opposing_player)
+        legal_moves     = state.GetGameStatus()["legal_moves"]
         legal_captures  = state.GetPlayersLegalCaptures(current_player, opposing_player)
         # Check if there are any legal captures
         if legal_captures:
@@ -37,20 +43,46 @@ class AgentCapture:
             result = random.choice(legal_moves)
         return result
 
+    # Release resources (nothing to release)
+    def Close(self):
+        return
+
 # Agent that uses the minimax algorithm.
+# - tt_size_mb: memory budget for the search's transposition table in MB (0 or None: no table)
+# - time_limit: time per move in seconds; node_limit: number of search nodes per move
+#   - With a time or node limit, use iterative deepening up to max_depth
+#   - Without limits, search to max_depth
+# - n_workers: number of processes that search root moves in parallel (1: search in this process only)
 class AgentMinimax:
-    def __init__(self, evaluator, max_depth):
+    def __init__(self, evaluator, max_depth, tt_size_mb=16, time_limit=None, node_limit=None, n_workers=1):
         self.evaluator  = evaluator
         self.max_depth  = max_depth
-        self.search = Search(self.evaluator, self.max_depth)
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.n_workers  = n_workers
+        if self.n_workers > 1:
+            self.search = ParallelSearch(self.evaluator, self.max_depth, self.n_workers, tt_size_mb=tt_size_mb)
+        else:
+            self.search = Search(self.evaluator, self.max_depth, tt_size_mb)
 
     # Choose move
-    def ChooseMove(self, state, current_player, opposing_player):
-        result = ""
+    # - time_limit: time for this move in seconds (default: the agent's time limit)
+    def ChooseMove(self, state, current_player, opposing_player, time_limit=None):
+        result = None
+        if time_limit is None:
+            time_limit = self.time_limit
         self.evaluator.ResetCounter()
-        #result  = self.search.GetBestMove(state, current_player, opposing_player)
-        result  = self.search.GetBestMoveAlphaBeta(state, current_player, opposing_player)
+        if time_limit or self.node_limit:
+            result  = self.search.SearchIterativeDeepening(state, current_player, opposing_player, time_limit, self.node_limit)
+        else:
+            result  = self.search.GetBestMove(state, current_player, opposing_player)
         counter = self.evaluator.GetCounter()
         print("Number of evaluations: {0}".format(counter))
-        print("Result: {0}".format(result))
+        if result:
+            print("Result: {0}".format(get_move_notation(result)))
         return result
+
+    # Release resources: stop the worker processes of a parallel search
+    def Close(self):
+        if hasattr(self.search, "Close"):
+            self.search.Close()
@@ -0,0 +1,158 @@
+# Attack tables
+
+# Precomputed bitboards of target squares for each square (and color for pawns)
+# - Tables are built once at import time
+# - Squares are numbered as in bitboard.py: square = 8 * y + x
+# - White pawns move up (decreasing y); black pawns move down (increasing y)
+# - Sliding pieces (bishop, rook, queen) use rays that stop at the first blocker
+
+# Knight jumps (x, y)
+KNIGHT_STEPS = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+
+# King steps (x, y)
+KING_STEPS = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+
+# Sliding directions (x, y)
+# - Positive directions increase the square index; negative directions decrease it
+BISHOP_POSITIVE_DIRECTIONS  = [(1, 1), (-1, 1)]
+BISHOP_NEGATIVE_DIRECTIONS  = [(-1, -1), (1, -1)]
+ROOK_POSITIVE_DIRECTIONS    = [(1, 0), (0, 1)]
+ROOK_NEGATIVE_DIRECTIONS    = [(-1, 0), (0, -1)]
+SLIDING_DIRECTIONS = BISHOP_POSITIVE_DIRECTIONS + BISHOP_NEGATIVE_DIRECTIONS + ROOK_POSITIVE_DIRECTIONS + ROOK_NEGATIVE_DIRECTIONS
+
+# Pawn direction (y) and starting row for each color
+PAWN_DIRECTION  = {"white": -1, "black": 1}
+PAWN_START_ROW  = {"white": 6,  "black": 1}
+
+# Get square index based on x, y coordinates (same numbering as bitboard.py)
+def get_square(x, y):
+    return 8 * y + x
+
+# Check if x, y coordinates are on the board
+def is_on_board(x, y):
+    return 0 <= x < 8 and 0 <= y < 8
+
+# Get bitboard of the squares reached from (x, y) using a list of steps
+def get_step_targets(x, y, steps):
+    targets = 0
+    for x_step, y_step in steps:
+        x_to = x + x_step
+        y_to = y + y_step
+        if is_on_board(x_to, y_to):
+            targets |= 1 << get_square(x_to, y_to)
+    return targets
+
+# Build knight attack table
+def build_knight_attacks():
+    return [get_step_targets(square % 8, square // 8, KNIGHT_STEPS) for square in range(64)]
+
+# Build king attack table
+def build_king_attacks():
+    return [get_step_targets(square % 8, square // 8, KING_STEPS) for square in range(64)]
+
+# Build pawn capture table for each color
+def build_pawn_attacks():
+    pawn_attacks = {}
+    for color, direction in PAWN_DIRECTION.items():
+        steps = [(-1, direction), (1, direction)]
+        pawn_attacks[color] = [get_step_targets(square % 8, square // 8, steps) for square in range(64)]
+    return pawn_attacks
+
+# Build pawn push tables (one square forward) for each color
+def build_pawn_pushes():
+    pawn_pushes = {}
+    for color, direction in PAWN_DIRECTION.items():
+        steps = [(0, direction)]
+        pawn_pushes[color] = [get_step_targets(square % 8, square // 8, steps) for square in range(64)]
+    return pawn_pushes
+
+# Build pawn double push tables (two squares forward from the starting row) for each color
+def build_pawn_double_pushes():
+    pawn_double_pushes = {}
+    for color, direction in PAWN_DIRECTION.items():
+        steps = [(0, 2 * direction)]
+        pawn_double_pushes[color] = [0 for square in range(64)]
+        for x in range(8):
+            square = get_square(x, PAWN_START_ROW[color])
+            pawn_double_pushes[color][square] = get_step_targets(x, PAWN_START_ROW[color], steps)
+    return pawn_double_pushes
+
+# Build ray tables: for each direction, the squares from a square to the edge of the board
+def build_rays():
+    rays = {}
+    for x_step, y_step in SLIDING_DIRECTIONS:
+        rays[(x_step, y_step)] = []
+        for square in range(64):
+            ray = 0
+            x_to = square % 8 + x_step
+            y_to = square // 8 + y_step
+            while is_on_board(x_to, y_to):
+                ray |= 1 << get_square(x_to, y_to)
+                x_to += x_step
+                y_to += y_step
+            rays[(x_step, y_step)].append(ray)
+    return rays
+
+# Build table of squares in between two squares (empty if not on the same row, column, or diagonal)
+def build_in_between():
+    in_between = [[0 for square_2 in range(64)] for square_1 in range(64)]
+    for square_1 in range(64):
+        for direction in SLIDING_DIRECTIONS:
+            x_step, y_step = direction
+            squares = 0
+            x_to = square_1 % 8 + x_step
+            y_to = square_1 // 8 + y_step
+            while is_on_board(x_to, y_to):
+                square_2 = get_square(x_to, y_to)
+                in_between[square_1][square_2] = squares
+                squares |= 1 << square_2
+                x_to += x_step
+                y_to += y_step
+    return in_between
+
+KNIGHT_ATTACKS      = build_knight_attacks()
+KING_ATTACKS        = build_king_attacks()
+PAWN_ATTACKS        = build_pawn_attacks()
+PAWN_PUSHES         = build_pawn_pushes()
+PAWN_DOUBLE_PUSHES  = build_pawn_double_pushes()
+RAYS                = build_rays()
+IN_BETWEEN          = build_in_between()
+
+BISHOP_POSITIVE_RAYS    = [RAYS[direction] for direction in BISHOP_POSITIVE_DIRECTIONS]
+BISHOP_NEGATIVE_RAYS    = [RAYS[direction] for direction in BISHOP_NEGATIVE_DIRECTIONS]
+ROOK_POSITIVE_RAYS      = [RAYS[direction] for direction in ROOK_POSITIVE_DIRECTIONS]
+ROOK_NEGATIVE_RAYS      = [RAYS[direction] for direction in ROOK_NEGATIVE_DIRECTIONS]
+
+# Get sliding attacks along rays
+# - Walk each ray until the first blocker (occupied square); the blocker is included
+# - For positive directions, the first blocker is the lowest square on the ray
+# - For negative directions, the first blocker is the highest square on the ray
+def get_sliding_attacks(square, occupancy, positive_rays, negative_rays):
+    attacks = 0
+    for rays in positive_rays:
+        ray = rays[square]
+        blockers = ray & occupancy
+        if blockers:
+            blocker = (blockers & -blockers).bit_length() - 1
+            ray ^= rays[blocker]
+        attacks |= ray
+    for rays in negative_rays:
+        ray = rays[square]
+        blockers = ray & occupancy
+        if blockers:
+            blocker = blockers.bit_length() - 1
+            ray ^= rays[blocker]
+        attacks |= ray
+    return attacks
+
+# Get bishop attacks for a square, given the occupancy of the board
+def get_bishop_attacks(square, occupancy):
+    return get_sliding_attacks(square, occupancy, BISHOP_POSITIVE_RAYS, BISHOP_NEGATIVE_RAYS)
+
+# Get rook attacks for a square, given the occupancy of the board
+def get_rook_attacks(square, occupancy):
+    return get_sliding_attacks(square, occupancy, ROOK_POSITIVE_RAYS, ROOK_NEGATIVE_RAYS)
+
+# Get queen attacks for a square, given the occupancy of the board
+def get_queen_attacks(square, occupancy):
+    return get_bishop_attacks(square, occupancy) | get_rook_attacks(square, occupancy)
@@ -10,6 +10,7 @@ from player import Player
 from tables import PieceTable
 from evaluate import EvaluateMaterial, EvaluatePosition
 from agent import AgentRandom, AgentCapture, AgentMinimax
+from move import get_move_positions, get_move_notation
 
 # Run the game
 def run_game():
@@ -59,8 +60,10 @@ def run_game():
     black_evaluator = EvaluatePosition(piece_table)
     
     # Create agents
+    # Use iterative deepening: search up to max_depth within time_limit (seconds) per move
     time_delay  = 0.5
-    max_depth   = 1
+    time_limit  = 1.0
+    max_depth   = 10
     
     #white_agent = AgentRandom()
     #white_agent = AgentCapture()
@@ -108,30 +111,26 @@ def run_game():
             if event.type == pygame.QUIT:
                 running = False
         
-        # Let the agent choose a move
+        # Let the agent choose a move (no move if the game is over)
         current_agent = current_player.GetAgent()
-        start_time  = time.time()
-        chosen_move = current_agent.ChooseMove(state, current_player, opposing_player)
-        end_time    = time.time()
-        calc_time   = end_time - start_time
+        chosen_move = None
+        if not state.GameIsOver():
+            start_time  = time.time()
+            chosen_move = current_agent.ChooseMove(state, current_player, opposing_player, time_limit)
+            end_time    = time.time()
+            calc_time   = end_time - start_time
         
         # Check that the move is not empty
         if chosen_move:
-            print("Chosen move: {0}".format(chosen_move))
+            print("Chosen move: {0}".format(get_move_notation(chosen_move)))
             print("Calculation time: {0:.3f} seconds".format(calc_time))
             # Get move positions
-            position_from, position_to = state.board.GetMovePositions(chosen_move)
+            position_from, position_to = get_move_positions(chosen_move)
             agent_move_position = position_to
             #print("position_from: {0}, position_to: {1}".format(position_from, position_to))
             
-            # Get piece to move!
-            piece_to_move = state.GetPieceInPosition(position_from)
-            # Move piece
-            state.MovePiece(chosen_move)
-            # Promote pawn if necessary
-            state.PromotePawn(piece_to_move)
-            # Switch current and opposing players
-            state.SwitchTurn()
+            # Make move (move piece, promote pawn if necessary, and switch current and opposing players)
+            state.MakeMove(chosen_move)
             current_player  = state.GetCurrentPlayer()
             opposing_player = state.GetOpposingPlayer()
             # Print detailed game state
@@ -160,6 +159,9 @@ def run_game():
         pygame.display.flip()
     
     # Game over! Time to quit.
+    # Stop the agents' worker processes (parallel search)
+    white_agent.Close()
+    black_agent.Close()
     pygame.quit()
 
 def main():
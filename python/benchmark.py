@@ -0,0 +1,145 @@
+# Search benchmark: search a fixed suite of positions and report the search speed (no screen needed)
+# - Search each position with iterative deepening up to its depth (without a time or node limit)
+# - Report nodes, evaluations, time, nodes per second, branching factor, and the chosen move
+# - Report the transposition table counters (probes, hits, and stores)
+# - Branching factor: nodes searched by the last iteration / nodes searched by the iteration before it
+# - Each position gets a new search (new transposition table, killer moves, and history), so runs can be compared
+#
+# Usage:
+#   python3 python/benchmark.py                         search the positions to their depths
+#   python3 python/benchmark.py --depth 3               search all positions to depth 3
+#   python3 python/benchmark.py --json > results.json   print the results as JSON (to compare runs)
+
+import argparse
+import json
+import time
+from search import Search
+from evaluate import EvaluateMaterial, EvaluatePosition
+from tables import PieceTable
+from move import get_move_notation
+from fen import create_state_from_fen
+from perft import PERFT_POSITIONS
+
+# Search depth for each benchmark position (by name)
+# - Positions are the reference positions of perft.py
+BENCHMARK_DEPTHS = {
+    "starting position" : 5,
+    "kiwipete"          : 3,
+    "position 3"        : 6,
+    "position 4"        : 4,
+    "position 5"        : 4,
+    "position 6"        : 4
+}
+
+# Benchmark positions: name, FEN, and search depth
+BENCHMARK_POSITIONS = [{"name": position["name"], "fen": position["fen"], "depth": BENCHMARK_DEPTHS[position["name"]]}
+                       for position in PERFT_POSITIONS]
+
+# Create an evaluator by name: "position" (material and piece tables) or "material"
+def create_evaluator(evaluator_name):
+    if evaluator_name == "material":
+        return EvaluateMaterial()
+    return EvaluatePosition(PieceTable())
+
+# Search one position and return its results (dictionary)
+def run_position(position, depth, evaluator, tt_size_mb):
+    state = create_state_from_fen(position["fen"])
+    search = Search(evaluator, depth, tt_size_mb, verbose=False)
+    evaluator.ResetCounter()
+
+    start_time = time.time()
+    best_move = search.SearchIterativeDeepening(state, state.GetCurrentPlayer(), state.GetOpposingPlayer())
+    run_time = time.time() - start_time
+
+    # Nodes searched by each iteration (the search counts nodes from the start of the search)
+    iterations = []
+    previous_nodes = 0
+    for iteration_depth, score, nodes, iteration_time in search.GetIterations():
+        iterations.append({
+            "depth"     : iteration_depth,
+            "score"     : search.GetWhiteScore(state, score),
+            "nodes"     : nodes - previous_nodes,
+            "time"      : round(iteration_time, 4)
+        })
+        previous_nodes = nodes
+    branching_factor = None
+    if len(iterations) >= 2 and iterations[-2]["nodes"]:
+        branching_factor = round(iterations[-1]["nodes"] / iterations[-2]["nodes"], 2)
+
+    # Transposition table counters: probes, hits, and stores (None: no transposition table)
+    tt_counters = None
+    transposition_table = search.GetTranspositionTable()
+    if transposition_table:
+        tt_counters = transposition_table.GetCounters()
+        tt_counters["hit_rate"] = round(tt_counters["hits"] / tt_counters["probes"], 3) if tt_counters["probes"] else 0
+
+    nodes = search.GetNodes()
+    return {
+        "name"              : position["name"],
+        "fen"               : position["fen"],
+        "depth"             : depth,
+        "move"              : get_move_notation(best_move) if best_move else None,
+        "score"             : iterations[-1]["score"] if iterations else None,
+        "principal_variation" : search.GetPrincipalVariationNotation(),
+        "nodes"             : nodes,
+        "evaluations"       : evaluator.GetCounter(),
+        "time"              : round(run_time, 4),
+        "nodes_per_second"  : round(nodes / run_time) if run_time > 0 else 0,
+        "branching_factor"  : branching_factor,
+        "transposition_table" : tt_counters,
+        "iterations"        : iterations
+    }
+
+# Search the benchmark positions
+# - depth: search depth for all positions (None: the depth of each position)
+# - Return the results (dictionary) with the results of each position and the totals
+def run_benchmark(depth=None, evaluator_name="position", tt_size_mb=16, print_results=True):
+    evaluator = create_evaluator(evaluator_name)
+    results = []
+    for position in BENCHMARK_POSITIONS:
+        position_depth = depth if depth is not None else position["depth"]
+        result = run_position(position, position_depth, evaluator, tt_size_mb)
+        results.append(result)
+        if print_results:
+            print("{0} (depth {1}): move: {2}, score: {3}, nodes: {4}, evaluations: {5}, time: {6:.3f} seconds, nodes/second: {7}, branching factor: {8}".format(
+                result["name"], result["depth"], result["move"], result["score"], result["nodes"], result["evaluations"],
+                result["time"], result["nodes_per_second"], result["branching_factor"]))
+            if result["transposition_table"]:
+                tt_counters = result["transposition_table"]
+                print(" - Transposition table: probes: {0}, hits: {1}, stores: {2}, hit rate: {3}".format(
+                    tt_counters["probes"], tt_counters["hits"], tt_counters["stores"], tt_counters["hit_rate"]))
+
+    total_nodes         = sum([result["nodes"] for result in results])
+    total_evaluations   = sum([result["evaluations"] for result in results])
+    total_time          = sum([result["time"] for result in results])
+    total = {
+        "nodes"             : total_nodes,
+        "evaluations"       : total_evaluations,
+        "time"              : round(total_time, 4),
+        "nodes_per_second"  : round(total_nodes / total_time) if total_time > 0 else 0
+    }
+    if print_results:
+        print("Total: nodes: {0}, evaluations: {1}, time: {2:.3f} seconds, nodes/second: {3}".format(
+            total["nodes"], total["evaluations"], total["time"], total["nodes_per_second"]))
+
+    return {
+        "evaluator"     : evaluator_name,
+        "tt_size_mb"    : tt_size_mb,
+        "positions"     : results,
+        "total"         : total
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Search a fixed suite of positions and report the search speed.")
+    parser.add_argument("--depth",      type=int,   default=None,       help="search depth for all positions (default: the depth of each position)")
+    parser.add_argument("--evaluator",  type=str,   default="position", choices=["position", "material"], help="evaluator")
+    parser.add_argument("--tt-size-mb", type=float, default=16,         help="memory budget for the transposition table in MB (0: no table)")
+    parser.add_argument("--json",       action="store_true",            help="print the results as JSON")
+    args = parser.parse_args()
+
+    benchmark = run_benchmark(args.depth, args.evaluator, args.tt_size_mb, not args.json)
+    if args.json:
+        print(json.dumps(benchmark, indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+# Bitboard class
+
+# Save the position using bitboards
+# - One 64-bit integer for each piece type and color
+# - Bit n is set if a piece of that type and color occupies square n
+# - Squares are numbered row by row from the top left of the board:
+#   square = 8 * y + x, so a8 = 0, h8 = 7, a1 = 56, and h1 = 63
+# - This matches the x, y coordinates used by State: state[y][x] is square 8 * y + x
+# - Occupancy masks are kept for white pieces, black pieces, and all pieces
+# - Piece values are the same as in State (white positive, black negative)
+# - Legal moves are generated from the bitboards using checkers and pinned pieces
+
+from attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, PAWN_DOUBLE_PUSHES, IN_BETWEEN
+from attacks import get_bishop_attacks, get_rook_attacks, get_queen_attacks
+from move import MOVE_TO_SHIFT, MOVE_PROMOTION_SHIFT, MOVE_FLAG_CAPTURE
+from move import get_move_from, get_move_to, get_move_promotion
+
+# All squares set
+ALL_SQUARES = (1 << 64) - 1
+
+# Final row for pawns of each color (pawns reaching this row are promoted)
+PROMOTION_ROWS = {
+    "white" : 0xFF,
+    "black" : 0xFF << 56
+}
+
+# Promotion piece value (for now, always promote pawns to queens)
+PROMOTION_PIECE = 5
+
+# Get square index based on x, y coordinates
+def get_square(x, y):
+    return 8 * y + x
+
+# Get x, y coordinates based on square index
+def get_xy(square):
+    return [square % 8, square // 8]
+
+# Get bitboard with only one square set
+def get_square_mask(square):
+    return 1 << square
+
+# Count the number of squares set in a bitboard
+def count_bits(bitboard):
+    return bin(bitboard).count("1")
+
+# Get the lowest square set in a bitboard
+def get_lowest_square(bitboard):
+    return (bitboard & -bitboard).bit_length() - 1
+
+# Get the highest square set in a bitboard
+def get_highest_square(bitboard):
+    return bitboard.bit_length() - 1
+
+# Get list of squares set in a bitboard
+def get_squares(bitboard):
+    squares = []
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        squares.append(lowest_bit.bit_length() - 1)
+        bitboard ^= lowest_bit
+    return squares
+
+# Get color based on piece value
+def get_color(value):
+    if value > 0:
+        return "white"
+    elif value < 0:
+        return "black"
+    return None
+
+# Get the other color
+def get_opposite_color(color):
+    if color == "white":
+        return "black"
+    return "white"
+
+class Bitboard:
+    def __init__(self):
+        self.pieces         = None
+        self.occupancy      = None
+        self.all_occupancy  = 0
+        self.squares        = None
+        self.king_squares   = None
+        # Chess pieces
+        self.chess_pieces = {
+            0: "empty",
+            1: "pawn",
+            2: "knight",
+            3: "bishop",
+            4: "rook",
+            5: "queen",
+            6: "king"
+        }
+        self.Clear()
+
+    def __str__(self):
+        return str(self.GetState())
+
+    # Remove all pieces
+    def Clear(self):
+        # Piece bitboards for each color; index with the piece value (1 to 6); index 0 is not used
+        self.pieces = {
+            "white" : [0 for i in range(7)],
+            "black" : [0 for i in range(7)]
+        }
+        # Occupancy for each color
+        self.occupancy = {
+            "white" : 0,
+            "black" : 0
+        }
+        # Occupancy for all pieces
+        self.all_occupancy = 0
+        # Piece value for each square (0: empty)
+        self.squares = [0 for i in range(64)]
+        # King square for each color (None: no king)
+        self.king_squares = {
+            "white" : None,
+            "black" : None
+        }
+
+    # Get bitboard for one piece type and color
+    def GetPieces(self, color, piece_value):
+        return self.pieces[color][piece_value]
+
+    # Get bitboard of all pieces for one color
+    def GetOccupancy(self, color):
+        return self.occupancy[color]
+
+    # Get bitboard of all pieces for both colors
+    def GetAllOccupancy(self):
+        return self.all_occupancy
+
+    # Get piece value in square (0: empty)
+    def GetPieceValue(self, square):
+        return self.squares[square]
+
+    # Get piece values for all squares (0: empty)
+    def GetPieceValues(self):
+        return self.squares
+
+    # Get piece type based on piece value
+    def GetPieceType(self, value):
+        return self.chess_pieces[abs(value)]
+
+    # Place a piece (value) in a square; replaces any piece already in the square
+    def SetPiece(self, square, value):
+        if self.squares[square]:
+            self.RemovePiece(square)
+        if value:
+            color = get_color(value)
+            mask = 1 << square
+            self.pieces[color][abs(value)]  |= mask
+            self.occupancy[color]           |= mask
+            self.all_occupancy              |= mask
+            self.squares[square] = value
+            if value == 6 or value == -6:
+                self.king_squares[color] = square
+
+    # Remove the piece in a square; return the value of the removed piece (0: empty)
+    def RemovePiece(self, square):
+        value = self.squares[square]
+        if value:
+            color = get_color(value)
+            mask = ~(1 << square)
+            self.pieces[color][abs(value)]  &= mask
+            self.occupancy[color]           &= mask
+            self.all_occupancy              &= mask
+            self.squares[square] = 0
+            if (value == 6 or value == -6) and self.king_squares[color] == square:
+                self.king_squares[color] = None
+        return value
+
+    # Move a piece from one square to another; return the value of the captured piece (0: empty)
+    def MovePiece(self, square_from, square_to):
+        value = self.RemovePiece(square_from)
+        captured_value = self.RemovePiece(square_to)
+        self.SetPiece(square_to, value)
+        return captured_value
+
+    # Get the square of a player's king (None if there is no king)
+    # - King squares are updated whenever a king is placed or removed
+    def GetKingSquare(self, color):
+        return self.king_squares[color]
+
+    # Get possible targets for the piece in a square (not checking if the king is left in check)
+    # - Knight, king, and pawn targets are looked up in the attack tables
+    # - Bishop, rook, and queen rays stop at the first blocker
+    # - Pawns can only move to empty squares, and can only capture pieces of opposite color
+    def GetPieceTargets(self, square):
+        value = self.squares[square]
+        piece_value = abs(value)
+        color = get_color(value)
+        own_occupancy = self.occupancy[color]
+        if piece_value == 1:
+            targets = PAWN_PUSHES[color][square] & ~self.all_occupancy
+            # The double push is only possible if the single push square is empty
+            if targets:
+                targets |= PAWN_DOUBLE_PUSHES[color][square] & ~self.all_occupancy
+            targets |= PAWN_ATTACKS[color][square] & self.occupancy[get_opposite_color(color)]
+            return targets
+        elif piece_value == 2:
+            targets = KNIGHT_ATTACKS[square]
+        elif piece_value == 3:
+            targets = get_bishop_attacks(square, self.all_occupancy)
+        elif piece_value == 4:
+            targets = get_rook_attacks(square, self.all_occupancy)
+        elif piece_value == 5:
+            targets = get_queen_attacks(square, self.all_occupancy)
+        elif piece_value == 6:
+            targets = KING_ATTACKS[square]
+        else:
+            targets = 0
+        return targets & ~own_occupancy
+
+    # Get squares attacked by a piece (value without color) of one color from a square, given the occupancy of the board
+    def GetPieceAttacks(self, piece_value, color, square, occupancy):
+        if piece_value == 1:
+            return PAWN_ATTACKS[color][square]
+        elif piece_value == 2:
+            return KNIGHT_ATTACKS[square]
+        elif piece_value == 3:
+            return get_bishop_attacks(square, occupancy)
+        elif piece_value == 4:
+            return get_rook_attacks(square, occupancy)
+        elif piece_value == 5:
+            return get_queen_attacks(square, occupancy)
+        elif piece_value == 6:
+            return KING_ATTACKS[square]
+        return 0
+
+    # Determine if a legal move (packed move) puts the opponent in check, without making the move
+    # - Direct check: the moved (or promoted) piece attacks the king from the square to
+    # - Discovered check: another piece attacks the king once the square from is empty
+    # - The moved piece cannot attack the king from the square from (the opponent would already be in check)
+    def MoveGivesCheck(self, move):
+        square_from = get_move_from(move)
+        square_to   = get_move_to(move)
+        value       = self.squares[square_from]
+        color       = get_color(value)
+        king_square = self.king_squares[get_opposite_color(color)]
+        if king_square is None:
+            return False
+        occupancy = (self.all_occupancy & ~(1 << square_from)) | (1 << square_to)
+        piece_value = get_move_promotion(move) or abs(value)
+        if self.GetPieceAttacks(piece_value, color, square_to, occupancy) & (1 << king_square):
+            return True
+        return self.IsSquareAttacked(king_square, color, occupancy)
+
+    # Get pieces of one color that attack a square, given the occupancy of the board
+    # - Look outward from the target square using the attack tables and rays
+    # - A pawn of one color attacks the square if a pawn of the other color on the square would attack the pawn
+    def GetAttackers(self, square, by_color, occupancy):
+        pieces = self.pieces[by_color]
+        queens = pieces[5]
+        attackers = KNIGHT_ATTACKS[square] & pieces[2]
+        attackers |= KING_ATTACKS[square] & pieces[6]
+        attackers |= PAWN_ATTACKS[get_opposite_color(by_color)][square] & pieces[1]
+        attackers |= get_bishop_attacks(square, occupancy) & (pieces[3] | queens)
+        attackers |= get_rook_attacks(square, occupancy) & (pieces[4] | queens)
+        return attackers
+
+    # Determine if a square is attacked by any piece of one color
+    # - Look outward from the target square; return as soon as an attacker is found
+    # - Optionally use a different occupancy (for example, without the king that is moving)
+    def IsSquareAttacked(self, square, by_color, occupancy=None):
+        pieces = self.pieces[by_color]
+        if KNIGHT_ATTACKS[square] & pieces[2]:
+            return True
+        if PAWN_ATTACKS[get_opposite_color(by_color)][square] & pieces[1]:
+            return True
+        if KING_ATTACKS[square] & pieces[6]:
+            return True
+        if occupancy is None:
+            occupancy = self.all_occupancy
+        queens = pieces[5]
+        bishops = pieces[3] | queens
+        if bishops and get_bishop_attacks(square, occupancy) & bishops:
+            return True
+        rooks = pieces[4] | queens
+        if rooks and get_rook_attacks(square, occupancy) & rooks:
+            return True
+        return False
+
+    # Get pinned pieces for one color
+    # - A piece is pinned if it is the only piece between its king and an opposing bishop, rook, or queen
+    # - Return a dictionary: pinned square -> squares that the pinned piece may move to (along the pin)
+    def GetPinnedPieces(self, color):
+        pinned = {}
+        king_square = self.GetKingSquare(color)
+        if king_square is None:
+            return pinned
+        opponent_pieces = self.pieces[get_opposite_color(color)]
+        queens = opponent_pieces[5]
+        # Opposing sliding pieces that would attack the king on an empty board
+        snipers  = get_bishop_attacks(king_square, 0) & (opponent_pieces[3] | queens)
+        snipers |= get_rook_attacks(king_square, 0) & (opponent_pieces[4] | queens)
+        for sniper_square in get_squares(snipers):
+            in_between = IN_BETWEEN[king_square][sniper_square]
+            blockers = in_between & self.all_occupancy
+            # Exactly one blocker, and it belongs to the king's color
+            if blockers and not (blockers & (blockers - 1)) and (blockers & self.occupancy[color]):
+                pinned[get_lowest_square(blockers)] = in_between | (1 << sniper_square)
+        return pinned
+
+    # Add packed moves (see move.py) from one square to a list of moves
+    # - Set the capture flag if the target square is occupied
+    # - Pawns moving to the final row are promoted
+    def AddMoves(self, moves, square_from, targets):
+        squares = self.squares
+        value = squares[square_from]
+        promotion_targets = 0
+        if value == 1 or value == -1:
+            promotion_targets = targets & PROMOTION_ROWS[get_color(value)]
+        while targets:
+            lowest_bit = targets & -targets
+            targets ^= lowest_bit
+            square_to = lowest_bit.bit_length() - 1
+            move = square_from | (square_to << MOVE_TO_SHIFT)
+            if squares[square_to]:
+                move |= MOVE_FLAG_CAPTURE
+            if lowest_bit & promotion_targets:
+                move |= PROMOTION_PIECE << MOVE_PROMOTION_SHIFT
+            moves.append(move)
+
+    # Get possible moves for one color as a list of packed moves (not checking if the king is left in check)
+    def GetPossibleMoves(self, color):
+        moves = []
+        for square_from in get_squares(self.occupancy[color]):
+            self.AddMoves(moves, square_from, self.GetPieceTargets(square_from))
+        return moves
+
+    # Get legal moves for one color as a list of packed moves (see move.py)
+    # - Find checkers and pinned pieces once for the position
+    # - The king cannot move to an attacked square (slide attacks are found without the king on the board)
+    # - In double check, only the king can move
+    # - In single check, other pieces must capture the checker or block the check
+    # - Pinned pieces can only move along the pin
+    # - If there is no king (test positions), possible moves are legal
+    # - captures_only: only generate captures and pawn promotions (for quiescence search)
+    def GetLegalMoves(self, color, captures_only=False):
+        moves = []
+        opponent_color  = get_opposite_color(color)
+        king_square     = self.GetKingSquare(color)
+        check_mask      = ALL_SQUARES
+        pinned          = {}
+        target_mask     = ALL_SQUARES
+        pawn_mask       = ALL_SQUARES
+        if captures_only:
+            target_mask = self.occupancy[opponent_color]
+            pawn_mask   = target_mask | PROMOTION_ROWS[color]
+        pawns = self.pieces[color][1]
+
+        if king_square is not None:
+            # King moves
+            occupancy_without_king = self.all_occupancy & ~(1 << king_square)
+            king_targets = 0
+            for square_to in get_squares(KING_ATTACKS[king_square] & ~self.occupancy[color] & target_mask):
+                if not self.IsSquareAttacked(square_to, opponent_color, occupancy_without_king):
+                    king_targets |= 1 << square_to
+            self.AddMoves(moves, king_square, king_targets)
+
+            checkers = self.GetAttackers(king_square, opponent_color, self.all_occupancy)
+            if checkers:
+                # Double check: only the king can move
+                if checkers & (checkers - 1):
+                    return moves
+                checker_square = get_lowest_square(checkers)
+                check_mask = checkers | IN_BETWEEN[king_square][checker_square]
+            pinned = self.GetPinnedPieces(color)
+
+        # Moves for other pieces
+        for square_from in get_squares(self.occupancy[color] & ~self.pieces[color][6]):
+            targets = self.GetPieceTargets(square_from) & check_mask
+            if (1 << square_from) & pawns:
+                targets &= pawn_mask
+            else:
+                targets &= target_mask
+            if square_from in pinned:
+                targets &= pinned[square_from]
+            if targets:
+                self.AddMoves(moves, square_from, targets)
+
+        return moves
+
+    # Set bitboards from a state (8x8 matrix of piece values)
+    # Note: index with y first (row), then x (column)
+    def SetFromState(self, state):
+        self.Clear()
+        for y in range(8):
+            for x in range(8):
+                value = state[y][x]
+                if value:
+                    self.SetPiece(get_square(x, y), value)
+
+    # Get state (8x8 matrix of piece values) from bitboards
+    # Note: index with y first (row), then x (column)
+    def GetState(self):
+        state = [self.squares[8 * y : 8 * y + 8] for y in range(8)]
+        return state
+
+    # Print a bitboard as an 8x8 grid
+    def PrintBitboard(self, bitboard):
+        for y in range(8):
+            row = ["1" if bitboard & (1 << get_square(x, y)) else "." for x in range(8)]
+            print(" ".join(row))
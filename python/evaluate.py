@@ -1,5 +1,92 @@
 # Evaluate classes
 
+from bitboard import count_bits, get_squares
+
+# Piece types for piece values (absolute value)
+PIECE_TYPES = {
+    1: "pawn",
+    2: "knight",
+    3: "bishop",
+    4: "rook",
+    5: "queen",
+    6: "king"
+}
+
+# Piece tables for each piece type in the middle game and in the end game (see PieceTable)
+MIDDLE_GAME_TABLES = {
+    "pawn"      : "pawn",
+    "knight"    : "knight",
+    "bishop"    : "bishop",
+    "rook"      : "rook",
+    "queen"     : "queen",
+    "king"      : "king_middle_game"
+}
+END_GAME_TABLES = {
+    "pawn"      : "pawn_end_game",
+    "knight"    : "knight",
+    "bishop"    : "bishop",
+    "rook"      : "rook",
+    "queen"     : "queen",
+    "king"      : "king_end_game"
+}
+
+# Game phase: the sum of the phase values of the pieces (both players)
+# - Starting position: MAX_PHASE (middle game); only pawns and kings left: 0 (end game)
+# - The phase can be above MAX_PHASE after promotions; it is limited to MAX_PHASE when it is used
+PHASE_VALUES = {
+    "pawn"      : 0,
+    "knight"    : 1,
+    "bishop"    : 1,
+    "rook"      : 2,
+    "queen"     : 4,
+    "king"      : 0
+}
+MAX_PHASE = 24
+
+# Middle game and end game scores are packed in one integer: middle game score + (end game score << SCORE_SHIFT)
+# - Packed scores can be added and subtracted like one score, so the state can keep both with one sum
+# - Each score must stay within +/- 2^(SCORE_SHIFT - 1)
+SCORE_SHIFT = 20
+SCORE_MASK  = (1 << SCORE_SHIFT) - 1
+SCORE_HALF  = 1 << (SCORE_SHIFT - 1)
+
+# Pack a middle game score and an end game score in one integer
+def pack_scores(middle_game_score, end_game_score):
+    return middle_game_score + (end_game_score << SCORE_SHIFT)
+
+# Get the middle game score and the end game score from a packed score
+def unpack_scores(packed_score):
+    middle_game_score = ((packed_score + SCORE_HALF) & SCORE_MASK) - SCORE_HALF
+    end_game_score    = (packed_score - middle_game_score) >> SCORE_SHIFT
+    return middle_game_score, end_game_score
+
+# Blend the middle game and end game scores based on the game phase (tapered evaluation)
+# - Integer division rounds toward zero, so that the same position gets the same score for white and black
+def taper_scores(middle_game_score, end_game_score, phase):
+    phase = min(phase, MAX_PHASE)
+    total = middle_game_score * phase + end_game_score * (MAX_PHASE - phase)
+    if total < 0:
+        return -(-total // MAX_PHASE)
+    return total // MAX_PHASE
+
+# Build phase values for each piece value (white positive, black negative) (see State.SetSquareScores)
+def build_phase_values():
+    phase_values = {}
+    for piece_value, piece_type in PIECE_TYPES.items():
+        phase_values[piece_value]  = PHASE_VALUES[piece_type]
+        phase_values[-piece_value] = PHASE_VALUES[piece_type]
+    return phase_values
+
+# Build square scores for material: the piece value in every square (material does not depend on the square)
+# - Return a dictionary: piece value (white positive, black negative) -> list of 64 scores
+# - Black scores are negative (the score is white - black)
+def build_material_scores(piece_values):
+    square_scores = {}
+    for piece_value, piece_type in PIECE_TYPES.items():
+        square_scores[piece_value]  = [piece_values[piece_type]] * 64
+        square_scores[-piece_value] = [-piece_values[piece_type]] * 64
+    return square_scores
+
 # Evaluation class: uses material (piece value) to determine evaluation.
 class EvaluateMaterial:
     def __init__(self):
@@ -12,6 +99,8 @@ class EvaluateMaterial:
             "king"      : 0
         }
         self.counter = 0
+        # Score of each piece in each square (see State.SetSquareScores): the piece value
+        self.square_scores = build_material_scores(self.piece_values)
     
     def GetCounter(self):
         return self.counter
@@ -24,34 +113,44 @@ class EvaluateMaterial:
     
     def IncrementCounter(self):
         self.counter += 1
+
+    def GetSquareScores(self):
+        return self.square_scores
     
     # Get total piece value: sum of piece values for a player
+    # - Count the pieces of each type using the bitboards
     def GetTotalValue(self, state, player):
         total_value = 0
         player_color = player.GetColor()
-        pieces = state.GetPlayersPieces(player_color)
-        for piece in pieces:
-            piece_type = piece.GetType()
-            value = self.piece_values[piece_type]
-            total_value += value
+        bitboard = state.GetBitboard()
+        for piece_value in range(1, 7):
+            piece_type = bitboard.GetPieceType(piece_value)
+            n_pieces = count_bits(bitboard.GetPieces(player_color, piece_value))
+            total_value += n_pieces * self.piece_values[piece_type]
         return total_value
 
     # Evaluate position:
     # - Checkmate: +infinity (white checkmates black), -infinity (black checkmates white)
     # - Stalemate: 0 (white or black)
-    # - Otherwise, return difference in total piece values
+    # - Otherwise, return the static evaluation (see EvaluateStatic)
     # - positive evaluation: good for white
     # - negative evaluation: good for black
-    def Evaluate(self, state):
-        # Add to evaluation counter
-        self.IncrementCounter()
-        
-        # Get players from the state
-        current_player  = state.GetCurrentPlayer()
-        opposing_player = state.GetOpposingPlayer()
-        
-        # Current player is in checkmate: the opposing player wins!
-        if state.PlayerIsInCheckmate(current_player, opposing_player):
+    # - in_check, n_legal_moves: whether the player to move is in check and the number of legal moves,
+    #   if already known (for example, by the search); None: get them from the game status (see State.GetGameStatus)
+    def Evaluate(self, state, in_check=None, n_legal_moves=None):
+        if n_legal_moves is None or in_check is None:
+            game_status     = state.GetGameStatus()
+            in_check        = game_status["in_check"]
+            n_legal_moves   = len(game_status["legal_moves"])
+
+        # The game is over: checkmate or stalemate
+        if n_legal_moves == 0:
+            # Add to evaluation counter
+            self.IncrementCounter()
+            # Current player is in stalemate: both players get 0.
+            if not in_check:
+                return 0
+            # Current player is in checkmate: the opposing player wins!
             # The current player is white
             if state.WhiteToMove():
                 # Black has checkmated white
@@ -60,18 +159,23 @@ class EvaluateMaterial:
             else:
                 # White has checkmated black
                 return float('inf')
-        
-        # Current player is in stalemate: both players get 0.
-        if state.PlayerIsInStalemate(current_player, opposing_player):
-            return 0
+
+        return self.EvaluateStatic(state)
+
+    # Static evaluation: difference in total piece values (white - black), without checking if the game is over
+    # - The state keeps the score up to date in MakeMove and UndoMove (see State.SetSquareScores)
+    def EvaluateStatic(self, state):
+        # Add to evaluation counter
+        self.IncrementCounter()
 
         # Get value of pieces
-        white_total_value = self.GetTotalValue(state, state.white_player)
-        black_total_value = self.GetTotalValue(state, state.black_player)
-        evaluation = white_total_value - black_total_value    
+        if state.GetSquareScores() is not self.square_scores:
+            state.SetSquareScores(self.square_scores)
+        evaluation = state.GetScore()
         return evaluation
     
 # Evaluation class: uses material (piece value) and position to determine evaluation.
+# - Tapered evaluation: blend middle game and end game piece table values based on the game phase
 class EvaluatePosition:
     def __init__(self, piece_table):
         self.piece_table = piece_table
@@ -84,6 +188,10 @@ class EvaluatePosition:
             "king"      : 0
         }
         self.counter = 0
+        # Score of each piece in each square (see State.SetSquareScores): the piece value and the piece table value,
+        # packed for the middle game and the end game (see pack_scores)
+        self.square_scores = self.BuildSquareScores()
+        self.phase_values  = build_phase_values()
     
     def GetCounter(self):
         return self.counter
@@ -96,56 +204,66 @@ class EvaluatePosition:
     
     def IncrementCounter(self):
         self.counter += 1
+
+    def GetSquareScores(self):
+        return self.square_scores
+
+    # Build the square scores from the flat piece-square values of the piece table (see PieceTable.GetPieceSquareValues)
+    # - Return a dictionary: piece value (white positive, black negative) -> list of 64 packed scores
+    # - Black scores are negative (the score is white - black)
+    def BuildSquareScores(self):
+        middle_game_values  = self.piece_table.GetPieceSquareValues(self.piece_values, MIDDLE_GAME_TABLES)
+        end_game_values     = self.piece_table.GetPieceSquareValues(self.piece_values, END_GAME_TABLES)
+        square_scores = {}
+        for piece_value, piece_type in PIECE_TYPES.items():
+            for color, sign in [("white", 1), ("black", -1)]:
+                middle_game_scores  = middle_game_values[color][piece_type]
+                end_game_scores     = end_game_values[color][piece_type]
+                square_scores[sign * piece_value] = [sign * pack_scores(middle_game_scores[square], end_game_scores[square]) for square in range(64)]
+        return square_scores
+
+    # Set the square scores and phase values of the state (if the state does not have them yet)
+    def SetSquareScores(self, state):
+        if state.GetSquareScores() is not self.square_scores:
+            state.SetSquareScores(self.square_scores, self.phase_values)
     
     # Get total piece value: sum of piece values for a player
+    # - Sum the packed square scores of the player's pieces, and blend them based on the game phase
     def GetTotalValue(self, state, player):
-        total_value = 0
+        self.SetSquareScores(state)
+        packed_score = 0
         player_color = player.GetColor()
-        pieces = state.GetPlayersPieces(player_color)
-        for piece in pieces:
-            piece_type      = piece.GetType()
-            piece_position  = piece.GetPosition()
-            table_name      = piece_type
-            
-            material_value = self.piece_values[piece_type]
-
-            # FIXME: Switch between king middle game and end game tables
-            if piece_type == "king":
-                table_name = "king_middle_game"
-            
-            table = self.piece_table.GetTable(table_name)
-            
-            # Note: table assumes the player is white; for black we have to modify y (row)
-            # For black, changing the row should be equivalent to flipping the table over the central horizontal axis
-            piece_x, piece_y = piece_position
-            row     = piece_y
-            column  = piece_x
-            if player_color == "black":
-                row = 7 - piece_y
-            # Note: index with y first (row), then x (column)
-            position_value = table[row][column]
-            
-            all_the_value = material_value + position_value
-            total_value += all_the_value
-        
-        return total_value
+        bitboard = state.GetBitboard()
+        for square in get_squares(bitboard.GetOccupancy(player_color)):
+            packed_score += self.square_scores[bitboard.GetPieceValue(square)][square]
+        # Black square scores are negative
+        if player_color == "black":
+            packed_score = -packed_score
+        middle_game_score, end_game_score = unpack_scores(packed_score)
+        return taper_scores(middle_game_score, end_game_score, state.GetPhase())
 
     # Evaluate position:
     # - Checkmate: +infinity (white checkmates black), -infinity (black checkmates white)
     # - Stalemate: 0 (white or black)
-    # - Otherwise, return difference in total piece values
+    # - Otherwise, return the static evaluation (see EvaluateStatic)
     # - positive evaluation: good for white
     # - negative evaluation: good for black
-    def Evaluate(self, state):
-        # Add to evaluation counter
-        self.IncrementCounter()
-        
-        # Get players from the state
-        current_player  = state.GetCurrentPlayer()
-        opposing_player = state.GetOpposingPlayer()
-        
-        # Current player is in checkmate: the opposing player wins!
-        if state.PlayerIsInCheckmate(current_player, opposing_player):
+    # - in_check, n_legal_moves: whether the player to move is in check and the number of legal moves,
+    #   if already known (for example, by the search); None: get them from the game status (see State.GetGameStatus)
+    def Evaluate(self, state, in_check=None, n_legal_moves=None):
+        if n_legal_moves is None or in_check is None:
+            game_status     = state.GetGameStatus()
+            in_check        = game_status["in_check"]
+            n_legal_moves   = len(game_status["legal_moves"])
+
+        # The game is over: checkmate or stalemate
+        if n_legal_moves == 0:
+            # Add to evaluation counter
+            self.IncrementCounter()
+            # Current player is in stalemate: both players get 0.
+            if not in_check:
+                return 0
+            # Current player is in checkmate: the opposing player wins!
             # The current player is white
             if state.WhiteToMove():
                 # Black has checkmated white
@@ -154,13 +272,17 @@ class EvaluatePosition:
             else:
                 # White has checkmated black
                 return float('inf')
-        
-        # Current player is in stalemate: both players get 0.
-        if state.PlayerIsInStalemate(current_player, opposing_player):
-            return 0
+
+        return self.EvaluateStatic(state)
+
+    # Static evaluation: difference in total piece values (white - black), without checking if the game is over
+    # - The state keeps the packed score and the game phase up to date in MakeMove and UndoMove (see State.SetSquareScores)
+    def EvaluateStatic(self, state):
+        # Add to evaluation counter
+        self.IncrementCounter()
 
         # Get value of pieces
-        white_total_value = self.GetTotalValue(state, state.white_player)
-        black_total_value = self.GetTotalValue(state, state.black_player)
-        evaluation = white_total_value - black_total_value    
+        self.SetSquareScores(state)
+        middle_game_score, end_game_score = unpack_scores(state.GetScore())
+        evaluation = taper_scores(middle_game_score, end_game_score, state.GetPhase())
         return evaluation
\ No newline at end of file
@@ -0,0 +1,54 @@
+# FEN tools
+
+# Read positions written in FEN (Forsyth-Edwards Notation)
+# - For example, the starting position is "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+# - Only the piece placement and the side to move are used (this game does not have castling or en passant)
+# - The first row in FEN is the 8th rank, which is y = 0 in the state (black starts at the top)
+
+from board import Board
+from state import State
+from player import Player
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+
+# Piece values for FEN letters (white: upper case, black: lower case)
+FEN_PIECE_VALUES = {
+    "p" : 1,
+    "n" : 2,
+    "b" : 3,
+    "r" : 4,
+    "q" : 5,
+    "k" : 6
+}
+
+# Get the state (8x8 matrix of piece values) and the side to move (True: white) from FEN
+# Note: index with y first (row), then x (column)
+def get_position_from_fen(fen):
+    fields = fen.split()
+    rows = fields[0].split("/")
+    if len(rows) != 8:
+        print("ERROR: The FEN '{0}' does not have 8 rows.".format(fen))
+    state = [[0 for x in range(8)] for y in range(8)]
+    for y, row in enumerate(rows[:8]):
+        x = 0
+        for letter in row:
+            if letter.isdigit():
+                x += int(letter)
+            else:
+                value = FEN_PIECE_VALUES[letter.lower()]
+                if letter.islower():
+                    value = -value
+                state[y][x] = value
+                x += 1
+    white_to_move = len(fields) < 2 or fields[1] == "w"
+    return state, white_to_move
+
+# Create a game state from FEN without a screen (for tools that do not draw the board)
+def create_state_from_fen(fen):
+    board = Board(None, None, None, None, 8, None)
+    white_player = Player("White", "white")
+    black_player = Player("Black", "black")
+    state = State(board, "shapes", white_player, black_player)
+    position, white_to_move = get_position_from_fen(fen)
+    state.SetPosition(position, white_to_move)
+    return state
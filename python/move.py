@@ -0,0 +1,55 @@
+# Move encoding
+
+# Moves are packed into one integer
+# - bits  0 to  5: square from
+# - bits  6 to 11: square to
+# - bits 12 to 14: promotion piece value (0: no promotion, 5: queen)
+# - bit  15:       capture flag
+# - Squares are numbered as in bitboard.py: square = 8 * y + x
+# - Convert to positions or "x1y1_x2y2" notation only for drawing, input, and printing
+
+MOVE_SQUARE_MASK        = 63
+MOVE_TO_SHIFT           = 6
+MOVE_PROMOTION_SHIFT    = 12
+MOVE_PROMOTION_MASK     = 7
+MOVE_FLAG_CAPTURE       = 1 << 15
+
+# Pack a move into an integer
+def encode_move(square_from, square_to, promotion=0, flags=0):
+    return square_from | (square_to << MOVE_TO_SHIFT) | (promotion << MOVE_PROMOTION_SHIFT) | flags
+
+# Get square from
+def get_move_from(move):
+    return move & MOVE_SQUARE_MASK
+
+# Get square to
+def get_move_to(move):
+    return (move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK
+
+# Get promotion piece value (0: no promotion)
+def get_move_promotion(move):
+    return (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK
+
+# Determine if a move is a capture
+def move_is_capture(move):
+    return bool(move & MOVE_FLAG_CAPTURE)
+
+# Determine if a move is a pawn promotion
+def move_is_promotion(move):
+    return bool(get_move_promotion(move))
+
+# Get positions from [x1, y1] and to [x2, y2]
+def get_move_positions(move):
+    square_from = get_move_from(move)
+    square_to   = get_move_to(move)
+    position_from   = [square_from % 8, square_from // 8]
+    position_to     = [square_to % 8, square_to // 8]
+    return position_from, position_to
+
+# Get move notation "x1y1_x2y2" (same as Board.GetMoveNotation)
+# For example, e2 to e4 is "46_44"
+def get_move_notation(move):
+    square_from = get_move_from(move)
+    square_to   = get_move_to(move)
+    result = "{0}{1}_{2}{3}".format(square_from % 8, square_from // 8, square_to % 8, square_to // 8)
+    return result
@@ -0,0 +1,196 @@
+# Parallel search classes
+
+# Search root moves in parallel with a pool of worker processes
+# - Python threads cannot search in parallel (global interpreter lock), so each worker is a process
+# - Each worker has its own Search (transposition table, killer moves, and history)
+# - Positions are sent to the workers as an 8x8 matrix of piece values and the side to move;
+#   each worker rebuilds its own state (the game state has images and a board that are not sent)
+# - The first root move is searched in the main process to get a score (alpha);
+#   the other root moves are searched by the workers with a null window (principal variation search)
+# - Alpha is shared: when a worker finds a better move, the other workers use the new alpha for their next moves
+# - The node count is shared: the node limit is for the whole search (all workers together)
+
+import multiprocessing
+import time
+from search import Search, INFINITY, MATE_SCORE
+from board import Board
+from state import State, GAME_CHECKMATE
+from player import Player
+
+# Worker process globals (set by init_worker)
+worker_search       = None
+worker_state        = None
+worker_hash         = None
+worker_search_id    = None
+shared_alpha        = None
+
+# Number of nodes a worker searches between updates of the shared node count
+NODE_COUNT_INTERVAL = 256
+
+# Search in a worker process
+# - The node limit is for all workers together: add the nodes searched to the shared node count
+#   every NODE_COUNT_INTERVAL nodes, and stop when the shared node count reaches the node limit
+class WorkerSearch(Search):
+    def __init__(self, evaluator, max_depth, shared_nodes, **search_options):
+        Search.__init__(self, evaluator, max_depth, **search_options)
+        self.shared_nodes   = shared_nodes
+        self.counted_nodes  = 0
+
+    # Add the nodes searched since the last update to the shared node count
+    # - Return the shared node count
+    def CountNodes(self):
+        with self.shared_nodes.get_lock():
+            self.shared_nodes.value += self.nodes - self.counted_nodes
+            total_nodes = self.shared_nodes.value
+        self.counted_nodes = self.nodes
+        return total_nodes
+
+    def BudgetIsSpent(self):
+        if self.deadline and time.time() >= self.deadline:
+            return True
+        if self.node_limit and self.nodes - self.counted_nodes >= NODE_COUNT_INTERVAL:
+            if self.CountNodes() >= self.node_limit:
+                return True
+        return False
+
+# Set up a worker process
+def init_worker(evaluator, max_depth, search_options, alpha, nodes):
+    global worker_search, worker_state, shared_alpha
+    worker_search = WorkerSearch(evaluator, max_depth, nodes, **search_options)
+    # Board without a screen (only used to check locations)
+    board = Board(None, None, None, None, 8, None)
+    worker_state  = State(board, "shapes", Player("White", "white"), Player("Black", "black"))
+    shared_alpha  = alpha
+
+# Set the worker state to a position: (8x8 matrix of piece values, white to move)
+def set_worker_position(position, hash_key):
+    global worker_hash
+    if worker_hash == hash_key:
+        return
+    matrix, white_to_move = position
+    worker_state.SetPosition(matrix, white_to_move)
+    worker_hash = hash_key
+
+# Search one root move in a worker process
+# - task: (search id, position, position hash, move, depth, beta, deadline, node limit for the whole search)
+# - Use the latest shared alpha, and share the score if it is better
+# - Do not search if the shared node count has already reached the node limit
+# - Return (move, score, alpha used, best line after the move, nodes, evaluations, stopped)
+def search_root_move(task):
+    global worker_search_id
+    search_id, position, hash_key, move, depth, beta, deadline, node_limit = task
+    set_worker_position(position, hash_key)
+
+    # Killer moves, history, and transposition table ages are kept for one search
+    search = worker_search
+    if worker_search_id != search_id:
+        search.StartSearch()
+        worker_search_id = search_id
+    search.nodes        = 0
+    search.counted_nodes = 0
+    search.deadline     = deadline
+    search.node_limit   = node_limit
+    search.stop         = False
+    evaluator = search.evaluator
+    n_evaluations = evaluator.GetCounter()
+
+    alpha = shared_alpha.value
+    score = 0
+    if node_limit and search.CountNodes() >= node_limit:
+        search.stop = True
+    else:
+        score = search.SearchRootMove(worker_state, move, depth, alpha, beta, False)
+        search.CountNodes()
+    if not search.stop and score > alpha:
+        with shared_alpha.get_lock():
+            if score > shared_alpha.value:
+                shared_alpha.value = min(score, beta)
+
+    n_evaluations = evaluator.GetCounter() - n_evaluations
+    return (move, score, alpha, list(search.pv_lines[1]), search.nodes, n_evaluations, search.stop)
+
+# Search that searches root moves in parallel
+# - n_workers: number of worker processes
+# - Other arguments are the same as for Search
+class ParallelSearch(Search):
+    def __init__(self, evaluator, max_depth, n_workers, **search_options):
+        Search.__init__(self, evaluator, max_depth, **search_options)
+        self.n_workers  = n_workers
+        self.search_id  = 0
+        self.alpha      = multiprocessing.Value("l", -INFINITY)
+        self.shared_nodes = multiprocessing.Value("q", 0)
+        self.pool       = multiprocessing.Pool(n_workers, initializer=init_worker,
+                                               initargs=(evaluator, max_depth, search_options, self.alpha, self.shared_nodes))
+
+    def GetNumberOfWorkers(self):
+        return self.n_workers
+
+    # Stop the worker processes
+    def Close(self):
+        if self.pool:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    # Prepare for a new search (also in the worker processes)
+    def StartSearch(self):
+        Search.StartSearch(self)
+        self.search_id += 1
+
+    # Search the root moves to a depth (same results as Search.SearchRoot)
+    # - Search the first move in this process, then the other moves in the worker processes
+    # - A move is only the best move if its score is above the alpha it was searched with
+    #   (otherwise, its score is only an upper bound)
+    def SearchRoot(self, state, current_player, opposing_player, depth, alpha, beta, first_move=None):
+        best_move   = None
+        best_score  = -INFINITY
+        self.pv_lines[0] = []
+
+        # Get legal moves
+        ordered_moves = self.GetRootMoves(state, current_player, opposing_player, first_move)
+
+        # The game is over: checkmate or stalemate
+        if not ordered_moves:
+            if state.GetGameStatus()["outcome"] == GAME_CHECKMATE:
+                best_score = -MATE_SCORE
+            else:
+                best_score = 0
+            return best_move, best_score
+
+        # Search the first move in this process
+        best_move   = ordered_moves[0]
+        best_score  = self.SearchRootMove(state, best_move, depth, alpha, beta, True)
+        if self.stop:
+            return best_move, best_score
+        self.pv_lines[0] = [best_move] + self.pv_lines[1]
+        alpha = max(alpha, best_score)
+        if alpha >= beta or len(ordered_moves) == 1:
+            return best_move, best_score
+
+        # Search the other moves in the worker processes
+        self.alpha.value = alpha
+        position = (state.GetBitboard().GetState(), state.WhiteToMove())
+        hash_key = state.GetHash()
+        # The workers add their nodes to the shared node count (see WorkerSearch)
+        self.shared_nodes.value = self.nodes
+        tasks = []
+        for move in ordered_moves[1:]:
+            tasks.append((self.search_id, position, hash_key, move, depth, beta, self.deadline, self.node_limit))
+        results = self.pool.map(search_root_move, tasks, chunksize=1)
+
+        # Combine the results
+        for move, score, move_alpha, pv_line, nodes, n_evaluations, stopped in results:
+            self.nodes += nodes
+            self.evaluator.SetCounter(self.evaluator.GetCounter() + n_evaluations)
+            if stopped:
+                self.stop = True
+            elif score > move_alpha and score > best_score:
+                best_score  = score
+                best_move   = move
+                self.pv_lines[0] = [move] + pv_line
+
+        # The search is not complete if the workers together went over the node limit
+        if self.node_limit and self.nodes >= self.node_limit:
+            self.stop = True
+
+        return best_move, best_score
@@ -0,0 +1,230 @@
+# Perft: count the positions reachable after n moves (performance test of move generation)
+# - Generate legal moves, make each move, count the positions after depth - 1 more moves, and undo the move
+# - Report the number of positions (nodes), the run time, and nodes per second
+# - Divide: report the number of positions after each root move (to find move generation bugs)
+# - Check the move generation with reference positions and their expected counts
+# - Bulk counting (faster): at depth 1, count the legal moves without making them
+# - Cache (faster): save the counts of subtrees by position hash and depth, so that transpositions are only counted once
+#
+# Usage:
+#   python3 python/perft.py                             check the reference positions
+#   python3 python/perft.py --depth 4                   count positions from the starting position
+#   python3 python/perft.py --depth 3 --fen "<FEN>"     count positions from a FEN position
+#   python3 python/perft.py --depth 3 --divide          count positions after each root move
+#   python3 python/perft.py --depth 6 --bulk --cache-mb 64
+#                                                       count positions with bulk counting and a 64 MB cache
+
+import argparse
+import sys
+import time
+from move import get_move_notation
+from fen import STARTING_FEN, create_state_from_fen
+
+# Reference positions and expected counts (depth: number of positions)
+# - Positions are from the Chess Programming Wiki "Perft Results" page: https://www.chessprogramming.org/Perft_Results
+# - This game does not have castling or en passant, and pawns are only promoted to queens.
+#   Castling rights are removed from the positions, and the counts are for these rules,
+#   so some counts are different from the standard counts
+#   (for example, the starting position has 4865609 positions at depth 5, including 258 en passant captures).
+PERFT_POSITIONS = [
+    {
+        "name"      : "starting position",
+        "fen"       : STARTING_FEN,
+        "counts"    : {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865351}
+    },
+    {
+        "name"      : "kiwipete",
+        "fen"       : "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/P1N2Q1p/PPPBBPPP/R3K2R w - - 0 1",
+        "counts"    : {1: 46, 2: 1907, 3: 88089, 4: 3615600}
+    },
+    {
+        "name"      : "position 3",
+        "fen"       : "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "counts"    : {1: 14, 2: 191, 3: 2810, 4: 43087, 5: 671300}
+    },
+    {
+        "name"      : "position 4",
+        "fen"       : "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w - - 0 1",
+        "counts"    : {1: 6, 2: 222, 3: 7855, 4: 305965}
+    },
+    {
+        "name"      : "position 5",
+        "fen"       : "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w - - 0 1",
+        "counts"    : {1: 40, 2: 1339, 3: 51750, 4: 1729274}
+    },
+    {
+        "name"      : "position 6",
+        "fen"       : "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 1",
+        "counts"    : {1: 46, 2: 2079, 3: 89890, 4: 3894594}
+    }
+]
+
+# Size of one cache entry in bytes: 3-item tuple (64), 64-bit hash (36), count (28), list slot (8)
+# - The depth is a small int, which Python shares, so it takes no extra memory
+CACHE_ENTRY_SIZE = 136
+
+# Cache for perft counts
+# - Not the search's TranspositionTable: a perft count is exact for its depth, so there are
+#   no bounds, best moves, or ages to keep, and one always-replace entry per slot is enough
+# - Fixed number of entries, set by a memory budget in MB
+# - Each entry is a tuple: (hash, depth, count); a new entry always replaces the old entry
+class PerftCache:
+    def __init__(self, size_mb=64):
+        self.size_mb    = size_mb
+        self.n_entries  = max(1, int(size_mb * 1024 * 1024) // CACHE_ENTRY_SIZE)
+        self.entries    = [None for i in range(self.n_entries)]
+        self.hits       = 0
+
+    def GetHits(self):
+        return self.hits
+
+    # Get the index of the entry for a position hash and depth
+    def GetIndex(self, hash_key, depth):
+        return (hash_key ^ (depth * 0x9E3779B97F4A7C15)) % self.n_entries
+
+    # Get the count for a position hash and depth (None if it is not in the cache)
+    def Get(self, hash_key, depth):
+        entry = self.entries[self.GetIndex(hash_key, depth)]
+        if entry and entry[0] == hash_key and entry[1] == depth:
+            self.hits += 1
+            return entry[2]
+        return None
+
+    # Save the count for a position hash and depth
+    def Save(self, hash_key, depth, count):
+        self.entries[self.GetIndex(hash_key, depth)] = (hash_key, depth, count)
+
+# Count the positions reachable after depth moves (half moves)
+def perft(state, depth):
+    if depth <= 0:
+        return 1
+    current_player  = state.GetCurrentPlayer()
+    opposing_player = state.GetOpposingPlayer()
+    n_nodes = 0
+    for move in state.GetPlayersLegalMoves(current_player, opposing_player):
+        state.MakeMove(move)
+        n_nodes += perft(state, depth - 1)
+        state.UndoMove()
+    return n_nodes
+
+# Count the positions reachable after depth moves, with bulk counting and an optional cache (PerftCache)
+# - At depth 1, the number of positions is the number of legal moves
+# - Look up the cache before generating moves: a cached position needs no move generation
+def perft_bulk(state, depth, cache=None):
+    if depth <= 0:
+        return 1
+    if cache and depth >= 2:
+        hash_key = state.GetHash()
+        n_nodes = cache.Get(hash_key, depth)
+        if n_nodes is not None:
+            return n_nodes
+    current_player  = state.GetCurrentPlayer()
+    opposing_player = state.GetOpposingPlayer()
+    moves = state.GetPlayersLegalMoves(current_player, opposing_player)
+    if depth == 1:
+        return len(moves)
+    n_nodes = 0
+    for move in moves:
+        state.MakeMove(move)
+        n_nodes += perft_bulk(state, depth - 1, cache)
+        state.UndoMove()
+    if cache:
+        cache.Save(hash_key, depth, n_nodes)
+    return n_nodes
+
+# Count the positions reachable after depth moves
+# - bulk: use bulk counting (see perft_bulk); cache: PerftCache or None (only used with bulk counting)
+def count_positions(state, depth, bulk=False, cache=None):
+    if bulk:
+        return perft_bulk(state, depth, cache)
+    return perft(state, depth)
+
+# Count the positions reachable after depth moves for each root move
+# - Return a dictionary: move notation ("x1y1_x2y2") -> number of positions
+def divide(state, depth, bulk=False, cache=None):
+    result = {}
+    current_player  = state.GetCurrentPlayer()
+    opposing_player = state.GetOpposingPlayer()
+    for move in state.GetPlayersLegalMoves(current_player, opposing_player):
+        state.MakeMove(move)
+        result[get_move_notation(move)] = count_positions(state, depth - 1, bulk, cache)
+        state.UndoMove()
+    return result
+
+# Get a cache for a memory budget in MB (None: no cache)
+def get_cache(cache_mb):
+    if cache_mb:
+        return PerftCache(cache_mb)
+    return None
+
+# Run perft for a position and print the results
+# - Return the number of positions
+def run_perft(fen, depth, divide_moves=False, bulk=False, cache_mb=0):
+    state = create_state_from_fen(fen)
+    cache = get_cache(cache_mb)
+    start_time = time.time()
+    if divide_moves:
+        counts = divide(state, depth, bulk, cache)
+        n_nodes = sum(counts.values())
+    else:
+        n_nodes = count_positions(state, depth, bulk, cache)
+    run_time = time.time() - start_time
+    if divide_moves:
+        for notation in sorted(counts):
+            print("{0}: {1}".format(notation, counts[notation]))
+        print("Moves: {0}".format(len(counts)))
+    print_result(depth, n_nodes, run_time)
+    return n_nodes
+
+# Print the number of positions, run time, and nodes per second
+def print_result(depth, n_nodes, run_time):
+    nodes_per_second = n_nodes / run_time if run_time > 0 else 0
+    print("Depth {0}: {1} nodes, {2:.3f} seconds, {3:.0f} nodes/second".format(depth, n_nodes, run_time, nodes_per_second))
+
+# Check the reference positions
+# - Skip counts larger than max_nodes (to keep the run time short)
+# - The cache is cleared for each position
+# - Return the number of failed counts
+def run_reference_positions(max_nodes, bulk=False, cache_mb=0):
+    n_failed = 0
+    for position in PERFT_POSITIONS:
+        print("--- {0}: {1}".format(position["name"], position["fen"]))
+        state = create_state_from_fen(position["fen"])
+        cache = get_cache(cache_mb)
+        for depth, expected in sorted(position["counts"].items()):
+            if expected > max_nodes:
+                continue
+            start_time = time.time()
+            n_nodes = count_positions(state, depth, bulk, cache)
+            run_time = time.time() - start_time
+            print_result(depth, n_nodes, run_time)
+            if n_nodes != expected:
+                n_failed += 1
+                print("ERROR: Expected {0} nodes, but found {1} nodes.".format(expected, n_nodes))
+    if n_failed:
+        print("FAILED: {0} counts are not correct.".format(n_failed))
+    else:
+        print("PASSED: All counts are correct.")
+    return n_failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Count the positions reachable after n moves (perft).")
+    parser.add_argument("--depth",      type=int,   default=None,           help="depth (half moves); without a depth, check the reference positions")
+    parser.add_argument("--fen",        type=str,   default=STARTING_FEN,   help="position in FEN (default: starting position)")
+    parser.add_argument("--divide",     action="store_true",                help="print the count for each root move")
+    parser.add_argument("--max-nodes",  type=int,   default=1000000,        help="largest reference count to check")
+    parser.add_argument("--bulk",       action="store_true",                help="count the legal moves at depth 1 without making them")
+    parser.add_argument("--cache-mb",   type=float, default=0,              help="memory budget in MB for the cache of subtree counts (with --bulk)")
+    args = parser.parse_args()
+    if args.depth is not None and args.depth < 1:
+        parser.error("--depth must be at least 1")
+
+    if args.depth is None:
+        n_failed = run_reference_positions(args.max_nodes, args.bulk, args.cache_mb)
+        if n_failed:
+            sys.exit(1)
+    else:
+        run_perft(args.fen, args.depth, args.divide, args.bulk, args.cache_mb)
+
+if __name__ == "__main__":
+    main()
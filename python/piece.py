@@ -1,5 +1,9 @@
 # Piece class and subclasses
 
+from bitboard import get_square, get_xy, get_squares
+from attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, PAWN_DOUBLE_PUSHES
+from attacks import get_bishop_attacks, get_rook_attacks, get_queen_attacks
+
 class Piece:
     def __init__(self, color, position):
         self.color      = color
@@ -144,56 +148,23 @@ class Pawn(Piece):
     # Get valid moves
     # - Constrained to an empty board
     # - Independent of other pieces (empty board)
+    # - Assume white pawns move up (decreasing y) and black pawns move down (increasing y)
+    # - Move forward one square, or two squares from the starting row
     def GetValidMoves(self):
-        moves = []
         color = self.GetColor()
-        position = self.GetPosition()
-        piece_x, piece_y = position
-        # Movement for pawn
-        # Assume white pawns move up (decreasing y)
-        if color == "white":
-            for y in range(8):
-                y_diff = y - piece_y
-                # Move forward one square
-                if y_diff == -1:
-                    moves.append([piece_x, y])
-                # Move forward two squares
-                if piece_y == 6:
-                    if y_diff == -2:
-                        moves.append([piece_x, y])
-        # Assume black pawns move down (increasing y)
-        if color == "black":
-            for y in range(8):
-                y_diff = y - piece_y
-                # Move forward one square
-                if y_diff == 1:
-                    moves.append([piece_x, y])
-                # Move forward two squares
-                if piece_y == 1:
-                    if y_diff == 2:
-                        moves.append([piece_x, y])
+        piece_x, piece_y = self.GetPosition()
+        square = get_square(piece_x, piece_y)
+        targets = PAWN_PUSHES[color][square] | PAWN_DOUBLE_PUSHES[color][square]
+        moves = [get_xy(target) for target in get_squares(targets)]
         return moves
     
     # Get Valid Captures
+    # - Assume white pawns capture up (decreasing y) and black pawns capture down (increasing y)
     def GetValidCaptures(self):
-        captures = []
         color = self.GetColor()
-        position = self.GetPosition()
-        piece_x, piece_y = position
-        # Pawn captures
-        # Check all x, y positions on the board
-        for x in range(8):
-            for y in range(8):
-                x_diff = x - piece_x
-                y_diff = y - piece_y
-                # Assume white pawns capture up (decreasing y)
-                if color == "white":
-                    if y_diff == -1 and abs(x_diff) == 1:
-                        captures.append([x, y])
-                # Assume black pawns capture down (increasing y)
-                if color == "black":
-                    if y_diff == 1 and abs(x_diff) == 1:
-                        captures.append([x, y])
+        piece_x, piece_y = self.GetPosition()
+        square = get_square(piece_x, piece_y)
+        captures = [get_xy(target) for target in get_squares(PAWN_ATTACKS[color][square])]
         return captures
 
 class Knight(Piece):
@@ -210,19 +181,10 @@ class Knight(Piece):
     # - Constrained to an empty board
     # - Independent of other pieces (empty board)
     def GetValidMoves(self):
-        moves = []
-        position = self.GetPosition()
-        piece_x, piece_y = position
-        # Movement for knight
-        # Check all x, y positions on the board
-        for x in range(8):
-            for y in range(8):
-                x_diff = x - piece_x
-                y_diff = y - piece_y
-                if (abs(x_diff) == 2 and abs(y_diff) == 1) or (abs(x_diff) == 1 and abs(y_diff) == 2):
-                    # Cannot move to current position
-                    if not (x_diff == 0 and y_diff == 0):
-                        moves.append([x, y])
+        piece_x, piece_y = self.GetPosition()
+        # Movement for knight: look up the knight attack table
+        square = get_square(piece_x, piece_y)
+        moves = [get_xy(target) for target in get_squares(KNIGHT_ATTACKS[square])]
         return moves
 
 class Bishop(Piece):
@@ -239,19 +201,10 @@ class Bishop(Piece):
     # - Constrained to an empty board
     # - Independent of other pieces (empty board)
     def GetValidMoves(self):
-        moves = []
-        position = self.GetPosition()
-        piece_x, piece_y = position
-        # Movement for bishop
-        # Check all x, y positions on the board
-        for x in range(8):
-            for y in range(8):
-                x_diff = x - piece_x
-                y_diff = y - piece_y
-                if abs(x_diff) == abs(y_diff):
-                    # Cannot move to current position
-                    if not (x_diff == 0 and y_diff == 0):
-                        moves.append([x, y])
+        piece_x, piece_y = self.GetPosition()
+        # Movement for bishop: diagonal rays on an empty board
+        square = get_square(piece_x, piece_y)
+        moves = [get_xy(target) for target in get_squares(get_bishop_attacks(square, 0))]
         return moves
 
 class Rook(Piece):
@@ -268,19 +221,10 @@ class Rook(Piece):
     # - Constrained to an empty board
     # - Independent of other pieces (empty board)
     def GetValidMoves(self):
-        moves = []
-        position = self.GetPosition()
-        piece_x, piece_y = position
-        
-        # Movement for rook
-        for x in range(8):
-            # Cannot move to current position
-            if not x == piece_x:
-                moves.append([x, piece_y])
-        for y in range(8):
-            # Cannot move to current position
-            if not y == piece_y:
-                moves.append([piece_x, y])
+        piece_x, piece_y = self.GetPosition()
+        # Movement for rook: row and column rays on an empty board
+        square = get_square(piece_x, piece_y)
+        moves = [get_xy(target) for target in get_squares(get_rook_attacks(square, 0))]
         return moves
     
 class Queen(Piece):
@@ -297,19 +241,10 @@ class Queen(Piece):
     # - Constrained to an empty board
     # - Independent of other pieces (empty board)
     def GetValidMoves(self):
-        moves = []
-        position = self.GetPosition()
-        piece_x, piece_y = position
-        # Movement for queen
-        # Check all x, y positions on the board
-        for x in range(8):
-            for y in range(8):
-                x_diff = x - piece_x
-                y_diff = y - piece_y
-                if abs(x_diff) == abs(y_diff) or x_diff == 0 or y_diff == 0:
-                    # Cannot move to current position
-                    if not (x_diff == 0 and y_diff == 0):
-                        moves.append([x, y])
+        piece_x, piece_y = self.GetPosition()
+        # Movement for queen: diagonal, row, and column rays on an empty board
+        square = get_square(piece_x, piece_y)
+        moves = [get_xy(target) for target in get_squares(get_queen_attacks(square, 0))]
         return moves
 
 class King(Piece):
@@ -328,17 +263,8 @@ class King(Piece):
     # - Constrained to an empty board
     # - Independent of other pieces (empty board)
     def GetValidMoves(self):
-        moves = []
-        position = self.GetPosition()
-        piece_x, piece_y = position
-        # Movement for king
-        # Check all x, y positions on the board
-        for x in range(8):
-            for y in range(8):
-                x_diff = x - piece_x
-                y_diff = y - piece_y
-                if abs(x_diff) <= 1 and abs(y_diff) <= 1:
-                    # Cannot move to current position
-                    if not (x_diff == 0 and y_diff == 0):
-                        moves.append([x, y])
+        piece_x, piece_y = self.GetPosition()
+        # Movement for king: look up the king attack table
+        square = get_square(piece_x, piece_y)
+        moves = [get_xy(target) for target in get_squares(KING_ATTACKS[square])]
         return moves
@@ -125,33 +125,18 @@ def run_game():
                         position_from = [x, y]
                     else:
                         # Determine if move is valid
-                        all_systems_go = False
+                        # - A player can only move his own piece
+                        # - The move must be possible for the piece
+                        # - The move must not result in check for the current player
+                        # The current player's legal moves enforce all of these; None if the move is not legal
                         position_to = [x, y]
-                        move_notation = board.GetMoveNotation(position_from, position_to)
-                        current_player_color = current_player.GetColor()
-                        piece_to_move = state.GetPieceInPosition(position_from)
-                        piece_to_move_color = piece_to_move.GetColor()
-                        piece_moves = state.GetPiecePossibleMoves(piece_to_move)
-
-                        # Determine if a player's move would put himself in check
-                        move_results_in_check = state.MoveResultsInCheck(current_player, opposing_player, move_notation)
-
-                        # A player can only move his own piece
-                        if current_player_color == piece_to_move_color:
-                            # Determine if move is possible for the piece
-                            if position_to in piece_moves:
-                                # Enforce that move does not result in check for the current player
-                                if not move_results_in_check:
-                                    all_systems_go = True
+                        move = state.GetMoveFromPositions(position_from, position_to)
+                        all_systems_go = bool(move)
 
                         # All systems go: move the piece!
                         if all_systems_go:
-                            # Move piece
-                            state.MovePiece(move_notation)
-                            # Promote pawn if necessary
-                            state.PromotePawn(piece_to_move)
-                            # Switch current and opposing players
-                            state.SwitchTurn()
+                            # Make move (move piece, promote pawn if necessary, and switch current and opposing players)
+                            state.MakeMove(move)
                             current_player  = state.GetCurrentPlayer()
                             opposing_player = state.GetOpposingPlayer()
                             # Print detailed game state
@@ -189,7 +174,7 @@ def run_game():
                 board.DrawSquare(CLICK_COLOR_EMPTY, square_x, square_y)
             else:
                 board.DrawSquare(CLICK_COLOR_PIECE, square_x, square_y)
-                state.DrawMovesForPiece(CLICK_COLOR_MOVES, xy_position, current_player, opposing_player)
+                state.DrawMovesForPiece(CLICK_COLOR_MOVES, xy_position)
 
         # Draw the pieces
         state.DrawPieces(pygame, screen, PIECE_LIGHT_COLOR, PIECE_DARK_COLOR, PIECE_BORDER_COLOR, SQUARES_PER_SIDE, SQUARE_SIDE)
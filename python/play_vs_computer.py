@@ -10,6 +10,7 @@ from player import Player
 from tables import PieceTable
 from evaluate import EvaluateMaterial, EvaluatePosition
 from agent import AgentRandom, AgentCapture, AgentMinimax
+from move import get_move_positions, get_move_notation
 
 # Run the game
 def run_game():
@@ -51,8 +52,10 @@ def run_game():
     #evaluator = EvaluateMaterial()
     evaluator = EvaluatePosition(piece_table)
     # Create agents
+    # Use iterative deepening: search up to max_depth within time_limit (seconds) per move
     time_delay  = 0.0
-    max_depth   = 1
+    time_limit  = 1.0
+    max_depth   = 10
     #black_agent = AgentRandom()
     #black_agent = AgentCapture()
     black_agent = AgentMinimax(evaluator, max_depth)
@@ -95,19 +98,19 @@ def run_game():
             # Get the current agent
             current_agent = current_player.GetAgent()
             
-            # Check if the player has an agent (is a computer player)
-            if current_agent:
+            # Check if the player has an agent (is a computer player) and the game is not over
+            if current_agent and not state.GameIsOver():
                 # Let the agent choose a move
                 start_time  = time.time()
-                chosen_move = current_agent.ChooseMove(state, current_player, opposing_player)
+                chosen_move = current_agent.ChooseMove(state, current_player, opposing_player, time_limit)
                 end_time    = time.time()
                 calc_time   = end_time - start_time
                 # Check that the move is not empty
                 if chosen_move:
-                    print("Chosen move: {0}".format(chosen_move))
+                    print("Chosen move: {0}".format(get_move_notation(chosen_move)))
                     print("Calculation time: {0:.3f} seconds".format(calc_time))
                     # Get move positions
-                    position_from, position_to = state.board.GetMovePositions(chosen_move)
+                    position_from, position_to = get_move_positions(chosen_move)
                     agent_move_position = position_to
                     #print("position_from: {0}, position_to: {1}".format(position_from, position_to))
                                         
@@ -165,29 +168,18 @@ def run_game():
                         position_from = [x, y]
                     else:
                         # Determine if move is valid
-                        all_systems_go = False
+                        # - A player can only move his own piece
+                        # - The move must be possible for the piece
+                        # - The move must not result in check for the current player
+                        # The current player's legal moves enforce all of these; None if the move is not legal
                         position_to = [x, y]
-                        move_notation = board.GetMoveNotation(position_from, position_to)
-                        current_player_color = current_player.GetColor()
-                        piece_to_move = state.GetPieceInPosition(position_from)
-                        piece_to_move_color = piece_to_move.GetColor()
-                        piece_moves = state.GetPiecePossibleMoves(piece_to_move)
-
-                        # Determine if a player's move would put himself in check
-                        move_results_in_check = state.MoveResultsInCheck(current_player, opposing_player, move_notation)
-
-                        # A player can only move his own piece
-                        if current_player_color == piece_to_move_color:
-                            # Determine if move is possible for the piece
-                            if position_to in piece_moves:
-                                # Enforce that move does not result in check for the current player
-                                if not move_results_in_check:
-                                    all_systems_go = True
+                        move = state.GetMoveFromPositions(position_from, position_to)
+                        all_systems_go = bool(move)
 
                         # All systems go: move the piece!
                         if all_systems_go:                            
                             # Make move
-                            state.MakeMove(move_notation)
+                            state.MakeMove(move)
                             # Switch current and opposing players
                             current_player  = state.GetCurrentPlayer()
                             opposing_player = state.GetOpposingPlayer()
@@ -233,7 +225,7 @@ def run_game():
                 board.DrawSquare(CLICK_COLOR_EMPTY, square_x, square_y)
             else:
                 board.DrawSquare(CLICK_COLOR_PIECE, square_x, square_y)
-                state.DrawMovesForPiece(CLICK_COLOR_MOVES, xy_position, current_player, opposing_player)
+                state.DrawMovesForPiece(CLICK_COLOR_MOVES, xy_position)
 
         # Draw the pieces
         state.DrawPieces(pygame, screen, PIECE_LIGHT_COLOR, PIECE_DARK_COLOR, PIECE_BORDER_COLOR, SQUARES_PER_SIDE, SQUARE_SIDE)
@@ -242,6 +234,8 @@ def run_game():
         pygame.display.flip()
 
     # Game over! Time to quit.
+    # Stop the agents' worker processes (parallel search)
+    black_agent.Close()
     pygame.quit()
 
 def main():
@@ -1,203 +1,552 @@
 # Search classes
 
+import time
+from move import get_move_notation, get_move_from, get_move_to, move_is_capture, move_is_promotion
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from state import GAME_CHECKMATE, GAME_STALEMATE
+
+# Scores
+# - The search uses negamax: scores are from the point of view of the player to move
+# - Checkmate scores are finite so that null windows work: MATE_SCORE - (number of plies to checkmate)
+# - INFINITY is larger than any score
+MATE_SCORE      = 1000000
+MATE_THRESHOLD  = MATE_SCORE - 1000
+INFINITY        = MATE_SCORE + 1
+
+# Maximum number of plies from the root
+MAX_PLY         = 128
+
+# Move ordering scores (see OrderMoves): promotions, then captures, then checks, then killer moves,
+# then other moves by history score (below ORDER_KILLER)
+ORDER_PROMOTION = 40000
+ORDER_CAPTURE   = 30000
+ORDER_CHECK     = 20000
+ORDER_KILLER    = 10000
+
+# Number of killer moves saved for each ply
+N_KILLERS       = 2
+
+# Selective search (see Negamax)
+# - Null-move pruning is used from this remaining depth
+# - Late-move reductions are used from this remaining depth, starting with this move in the move order
+NULL_MOVE_MIN_DEPTH = 3
+LMR_MIN_DEPTH       = 3
+LMR_MIN_MOVE_INDEX  = 3
+
+# Checkmate scores in the transposition table are saved relative to the position, not the root
+def score_to_table(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+def score_from_table(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
 class Search:
-    def __init__(self, evaluator, max_depth):
+    # tt_size_mb: memory budget for the transposition table in MB (0 or None: no transposition table)
+    # aspiration_window: half width of the first window around the previous iteration's score, in pawns (0: no aspiration windows)
+    # quiescence: at depth 0, continue searching captures and promotions (see Quiescence)
+    # null_move_reduction: depth reduction for null-move pruning (0: no null-move pruning)
+    # late_move_reduction: depth reduction for late quiet moves (0: no late-move reductions)
+    # verbose: print the results of each search
+    def __init__(self, evaluator, max_depth, tt_size_mb=16, aspiration_window=0.5, quiescence=True,
+                 null_move_reduction=2, late_move_reduction=1, verbose=True):
         self.evaluator = evaluator
         self.max_depth = max_depth
+        # Aspiration window half width in the evaluator's units (at least 1)
+        self.aspiration_window = 0
+        if aspiration_window:
+            self.aspiration_window = max(1, round(aspiration_window * self.evaluator.piece_values["pawn"]))
+        self.quiescence = quiescence
+        self.null_move_reduction = null_move_reduction
+        self.late_move_reduction = late_move_reduction
+        self.verbose = verbose
+        # Delta pruning margin: two pawns (in the evaluator's units)
+        self.delta_margin = 2 * self.evaluator.piece_values["pawn"]
+        self.transposition_table = None
+        if tt_size_mb:
+            self.transposition_table = TranspositionTable(tt_size_mb)
+        # Search budget (see SearchIterativeDeepening)
+        self.nodes      = 0
+        self.deadline   = None
+        self.node_limit = None
+        self.stop       = False
+        # Principal variation: the line of best moves for both players, found by the last completed search
+        # - pv_lines[ply]: the best line found from a node at this ply (triangular PV table)
+        self.pv_lines               = [[] for i in range(MAX_PLY + 1)]
+        self.principal_variation    = []
+        # Completed iterations of the last iterative deepening search: list of (depth, score, nodes, time)
+        # - nodes and time (seconds) are totals from the start of the search
+        self.iterations = []
+        # Quiet moves (not captures or promotions) that caused beta cutoffs, used to order moves
+        # - killers[ply]: the latest quiet moves that caused a cutoff at this ply (most recent first)
+        # - history[square_from][square_to]: sum of depth^2 over cutoffs for this quiet move
+        self.killers = [[None] * N_KILLERS for i in range(MAX_PLY + 1)]
+        self.history = [[0] * 64 for i in range(64)]
+
+    def GetTranspositionTable(self):
+        return self.transposition_table
+
+    # Get the number of nodes searched by Negamax since the last reset
+    def GetNodes(self):
+        return self.nodes
+
+    # Get the completed iterations of the last iterative deepening search: list of (depth, score, nodes, time)
+    def GetIterations(self):
+        return self.iterations
+
+    # Get the principal variation (list of moves) from the last completed search
+    def GetPrincipalVariation(self):
+        return self.principal_variation
+
+    # Get the principal variation in "x1y1_x2y2" notation
+    def GetPrincipalVariationNotation(self):
+        return " ".join([get_move_notation(move) for move in self.principal_variation])
+
+    # Prepare for a new search
+    # - Entries in the transposition table from earlier searches can be replaced first
+    # - Clear the search budget (see SearchIterativeDeepening) and the killer moves
+    # - Age the history scores: halve them, so that recent cutoffs count more
+    def StartSearch(self):
+        if self.transposition_table:
+            self.transposition_table.NewSearch()
+        self.nodes      = 0
+        self.deadline   = None
+        self.node_limit = None
+        self.stop       = False
+        self.principal_variation = []
+        self.iterations = []
+        for ply_killers in self.killers:
+            for i in range(N_KILLERS):
+                ply_killers[i] = None
+        for square_history in self.history:
+            for square_to in range(64):
+                square_history[square_to] //= 2
+
+    # Save a quiet move (not a capture or promotion) that caused a beta cutoff
+    # - Killer moves: keep the latest moves for the ply
+    # - History: add depth^2, so that cutoffs far from the leaves count more
+    def SaveCutoffMove(self, move, depth, ply):
+        ply_killers = self.killers[ply]
+        if ply_killers[0] != move:
+            ply_killers.pop()
+            ply_killers.insert(0, move)
+        self.history[get_move_from(move)][get_move_to(move)] += depth * depth
+
+    # Check if the time or node budget has run out
+    def BudgetIsSpent(self):
+        if self.deadline and time.time() >= self.deadline:
+            return True
+        if self.node_limit and self.nodes >= self.node_limit:
+            return True
+        return False
     
-    # The minimax algorithm
-    def Minimax(self, state, depth, isMaximizingPlayer):
+    # Evaluate the position for the player to move
+    # - The evaluator scores positions from white's point of view, with +/- infinity for checkmate
+    # - in_check, n_legal_moves: whether the player to move is in check and the number of legal moves, found by the search
+    #   - Without them, use the static evaluation (checkmate and stalemate are not detected here)
+    def EvaluateForPlayer(self, state, ply, in_check=None, n_legal_moves=None):
+        if n_legal_moves is None:
+            score = self.evaluator.EvaluateStatic(state)
+        else:
+            score = self.evaluator.Evaluate(state, in_check, n_legal_moves)
+        if score == float('inf'):
+            score = MATE_SCORE - ply
+        elif score == float('-inf'):
+            score = -MATE_SCORE + ply
+        if state.BlackToMove():
+            score = -score
+        return score
+
+    # Get a score from white's point of view (positive: good for white)
+    def GetWhiteScore(self, state, score):
+        if state.BlackToMove():
+            return -score
+        return score
+
+    # Negamax with alpha-beta pruning and principal variation search (PVS)
+    # - Scores are from the point of view of the player to move
+    # - Search the first move with the full window; search the other moves with a null window
+    #   (alpha, alpha + 1) to prove that they are not better, and search again if one is better
+    # - Probe the transposition table: use saved scores for cutoffs and search the saved best move first
+    #   - Only use cutoffs in null window searches; a cutoff in the full window would cut the principal variation
+    # - Save the result with its bound type: a score at or below alpha is an upper bound,
+    #   and a score at or above beta is a lower bound
+    # - Stop if the search budget has run out: the result is not valid and is not saved
+    # - Save the best line from this node when a move raises alpha (see pv_lines)
+    # - Null-move pruning (null window searches, not in check): pass the turn and search to a reduced depth;
+    #   if the score is still at least beta, a real move would be too (except in zugzwang)
+    #   - Not after a null move, and not if the player only has pawns and the king (zugzwang is likely)
+    # - Late-move reductions: search quiet moves late in the move order to a reduced depth first;
+    #   search again to the full depth if the score beats alpha
+    def Negamax(self, state, depth, alpha, beta, ply, allow_null_move=True):
         # Get players from the state
         current_player  = state.GetCurrentPlayer()
         opposing_player = state.GetOpposingPlayer()
         
-        # if depth is 0 or the game is over, return the current evaluation
-        if depth == 0 or state.GameIsOver(current_player, opposing_player):
-            return self.evaluator.Evaluate(state)
+        # Check the search budget
+        self.nodes += 1
+        if self.stop or self.BudgetIsSpent():
+            self.stop = True
+            return 0
+
+        # The best line from this node is found below
+        self.pv_lines[ply] = []
+
+        # Probe the transposition table
+        hash_key    = state.GetHash()
+        tt_move     = None
+        if self.transposition_table:
+            entry = self.transposition_table.Probe(hash_key)
+            if entry:
+                entry_hash, entry_depth, entry_score, entry_bound, tt_move, entry_age = entry
+                if entry_depth >= depth and beta - alpha == 1:
+                    score = score_from_table(entry_score, ply)
+                    if entry_bound == EXACT:
+                        return score
+                    elif entry_bound == LOWER_BOUND:
+                        alpha = max(alpha, score)
+                    elif entry_bound == UPPER_BOUND:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+        
+        # if depth is 0, return the current evaluation (after captures and promotions for quiescence search)
+        if depth <= 0 or ply >= MAX_PLY:
+            if self.quiescence:
+                return self.Quiescence(state, alpha, beta, ply)
+            # Without quiescence search, find checkmate and stalemate here
+            game_status = state.GetGameStatus()
+            return self.EvaluateForPlayer(state, ply, game_status["in_check"], len(game_status["legal_moves"]))
         
+        in_check = state.PlayerIsInCheck(current_player, opposing_player)
+
+        # Null-move pruning
+        if (self.null_move_reduction and allow_null_move and depth >= NULL_MOVE_MIN_DEPTH and beta - alpha == 1
+                and not in_check and state.PlayerHasNonPawnPieces(current_player)):
+            state.MakeNullMove()
+            score = -self.Negamax(state, depth - 1 - self.null_move_reduction, -beta, -beta + 1, ply + 1, False)
+            state.UndoNullMove()
+            if self.stop:
+                return 0
+            if score >= beta:
+                # Do not return an unproven checkmate score
+                if score >= MATE_THRESHOLD:
+                    return beta
+                return score
+
         # Get legal moves
-        legal_moves = state.GetPlayersLegalMoves(current_player, opposing_player)
-
-        if isMaximizingPlayer:
-            max_eval = float('-inf')
-            for move in legal_moves:
-                position_from, position_to = state.board.GetMovePositions(move)
-                piece_to_move       = state.GetPieceInPosition(position_from)
-                piece_to_capture    = state.GetPieceInPosition(position_to)
-                state.MakeMove(move)
-                eval = self.Minimax(state, depth - 1, False)
-                state.UndoMove(move, piece_to_move, piece_to_capture)
-                max_eval = max(max_eval, eval)
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for move in legal_moves:
-                position_from, position_to = state.board.GetMovePositions(move)
-                piece_to_move       = state.GetPieceInPosition(position_from)
-                piece_to_capture    = state.GetPieceInPosition(position_to)
-                state.MakeMove(move)
-                eval = self.Minimax(state, depth - 1, True)
-                state.UndoMove(move, piece_to_move, piece_to_capture)
-                min_eval = min(min_eval, eval)
-            return min_eval
-
-    # The minimax algorithm with alpha-beta pruning
-    def MinimaxAlphaBeta(self, state, depth, alpha, beta, isMaximizingPlayer):
+        game_status = state.GetGameStatus()
+        legal_moves = game_status["legal_moves"]
+
+        # The game is over: checkmate (sooner is worse for the player to move) or stalemate
+        if game_status["outcome"] == GAME_CHECKMATE:
+            return -MATE_SCORE + ply
+        if game_status["outcome"] == GAME_STALEMATE:
+            return 0
+
+        # Search the best move from the transposition table first, then the other moves in order
+        legal_moves = self.OrderMoves(state, legal_moves, ply)
+        if tt_move in legal_moves:
+            legal_moves.remove(tt_move)
+            legal_moves.insert(0, tt_move)
+
+        # Window that is searched (after the transposition table probe)
+        search_alpha    = alpha
+        search_beta     = beta
+        best_move       = None
+        best_score      = -INFINITY
+
+        for move_index, move in enumerate(legal_moves):
+            # Late-move reduction: quiet moves late in the move order (not killer moves or checks)
+            reduction = 0
+            if (self.late_move_reduction and depth >= LMR_MIN_DEPTH and move_index >= LMR_MIN_MOVE_INDEX and not in_check
+                    and not move_is_capture(move) and not move_is_promotion(move)
+                    and move not in self.killers[ply] and not state.IsCheck(move)):
+                reduction = self.late_move_reduction
+            state.MakeMove(move)
+            if best_move is None:
+                score = -self.Negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self.Negamax(state, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)
+                if reduction and score > alpha:
+                    score = -self.Negamax(state, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.Negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            state.UndoMove()
+            if self.stop:
+                return 0
+            if best_move is None or score > best_score:
+                best_score  = score
+                best_move   = move
+            if score > alpha:
+                alpha = score
+                self.pv_lines[ply] = [move] + self.pv_lines[ply + 1]
+            if alpha >= beta:
+                if not move_is_capture(move) and not move_is_promotion(move):
+                    self.SaveCutoffMove(move, depth, ply)
+                break
+
+        # Save the result in the transposition table
+        if self.transposition_table:
+            if best_score <= search_alpha:
+                bound = UPPER_BOUND
+            elif best_score >= search_beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self.transposition_table.Store(hash_key, depth, score_to_table(best_score, ply), bound, best_move)
+
+        return best_score
+
+    # Quiescence search: search captures and promotions until the position is quiet
+    # - Avoid the horizon effect: do not stop in the middle of an exchange
+    # - Stand pat: the player to move does not have to capture, so the evaluation is a lower bound
+    #   (static evaluation: stalemate is not detected in quiescence search)
+    # - Delta pruning: skip captures that cannot raise alpha, even with a margin (not promotions)
+    # - In check, search all legal moves (no stand pat): the player has to get out of check
+    # - Search the moves in order (see OrderMoves)
+    def Quiescence(self, state, alpha, beta, ply):
         # Get players from the state
         current_player  = state.GetCurrentPlayer()
         opposing_player = state.GetOpposingPlayer()
         
-        # if depth is 0 or the game is over, return the current evaluation
-        if depth == 0 or state.GameIsOver(current_player, opposing_player):
-            return self.evaluator.Evaluate(state)
-        
-        # Get legal moves
-        legal_moves = state.GetPlayersLegalMoves(current_player, opposing_player)
-
-        if isMaximizingPlayer:
-            max_eval = float('-inf')
-            for move in legal_moves:
-                position_from, position_to = state.board.GetMovePositions(move)
-                piece_to_move       = state.GetPieceInPosition(position_from)
-                piece_to_capture    = state.GetPieceInPosition(position_to)
-                state.MakeMove(move)
-                eval = self.MinimaxAlphaBeta(state, depth - 1, alpha, beta, False)
-                state.UndoMove(move, piece_to_move, piece_to_capture)
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-            return max_eval
+        # Check the search budget
+        self.nodes += 1
+        if self.stop or self.BudgetIsSpent():
+            self.stop = True
+            return 0
+
+        # The best line from this node is found below
+        self.pv_lines[ply] = []
+
+        if ply >= MAX_PLY:
+            return self.EvaluateForPlayer(state, ply)
+
+        in_check = state.PlayerIsInCheck(current_player, opposing_player)
+        if in_check:
+            moves = state.GetGameStatus()["legal_moves"]
+            if not moves:
+                return -MATE_SCORE + ply
+            best_score = -INFINITY
+            stand_pat  = None
         else:
-            min_eval = float('inf')
-            for move in legal_moves:
-                position_from, position_to = state.board.GetMovePositions(move)
-                piece_to_move       = state.GetPieceInPosition(position_from)
-                piece_to_capture    = state.GetPieceInPosition(position_to)
-                state.MakeMove(move)
-                eval = self.MinimaxAlphaBeta(state, depth - 1, alpha, beta, True)
-                state.UndoMove(move, piece_to_move, piece_to_capture)
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-            return min_eval
+            stand_pat = self.EvaluateForPlayer(state, ply)
+            if stand_pat >= beta:
+                return stand_pat
+            alpha       = max(alpha, stand_pat)
+            best_score  = stand_pat
+            moves = state.GetPlayersLegalCapturesAndPromotions(current_player, opposing_player)
+        
+        # Delta pruning
+        if stand_pat is not None:
+            bitboard = state.GetBitboard()
+            piece_values = self.evaluator.piece_values
+            pruned_moves = []
+            for move in moves:
+                if not move_is_promotion(move):
+                    captured_type = bitboard.GetPieceType(bitboard.GetPieceValue(get_move_to(move)))
+                    if stand_pat + piece_values[captured_type] + self.delta_margin <= alpha:
+                        continue
+                pruned_moves.append(move)
+            moves = pruned_moves
+
+        for move in self.OrderMoves(state, moves, ply):
+            state.MakeMove(move)
+            score = -self.Quiescence(state, -beta, -alpha, ply + 1)
+            state.UndoMove()
+            if self.stop:
+                return 0
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+                self.pv_lines[ply] = [move] + self.pv_lines[ply + 1]
+            if alpha >= beta:
+                break
+
+        return best_score
 
     # Get the best move
-    # - Use correct current / opposing players
-    # - Use correct starting best evaluations
-    # - Use correct minimizing / maximizing players
+    # - Search to a fixed depth (max_depth)
     def GetBestMove(self, state, current_player, opposing_player):
-        best_move = ""
-        
-        # Get legal moves
-        legal_moves = state.GetPlayersLegalMoves(current_player, opposing_player)
+        # No search budget
+        self.StartSearch()
 
-        # Determine if the current player is the maximizing player
-        # Define white as the maximizing player
-        currentPlayerIsMaximizing = state.WhiteToMove()
-        opposingPlayerIsMaximizing = not currentPlayerIsMaximizing
-        
-        # Set starting best evaluations
-        if currentPlayerIsMaximizing:
-            best_eval = float('-inf')
-        else:
-            best_eval = float('inf')
+        best_move, best_score = self.SearchRoot(state, current_player, opposing_player, self.max_depth, -INFINITY, INFINITY)
+        self.principal_variation = list(self.pv_lines[0])
+
+        if self.verbose:
+            print("Best evaluation: {0}".format(self.GetWhiteScore(state, best_score)))
+            if best_move:
+                print("Best move: {0}".format(get_move_notation(best_move)))
+                print("Principal variation: {0}".format(self.GetPrincipalVariationNotation()))
         
-        # Check each legal move
-        for move in legal_moves:
-            position_from, position_to = state.board.GetMovePositions(move)
-            piece_to_move       = state.GetPieceInPosition(position_from)
-            piece_to_capture    = state.GetPieceInPosition(position_to)
-            state.MakeMove(move)
-            eval = self.Minimax(state, self.max_depth, opposingPlayerIsMaximizing)
-            state.UndoMove(move, piece_to_move, piece_to_capture)
+        return best_move
 
-            if currentPlayerIsMaximizing:
-                if eval > best_eval:
-                    best_eval = eval
-                    best_move = move
-            else:
-                if eval < best_eval:
-                    best_eval = eval
-                    best_move = move
+    # Get the best move, using iterative deepening
+    # - Search to depth 0, 1, 2, ... (up to max_depth) until the time limit (seconds) or node limit runs out
+    # - Return the best move from the last completed search
+    # - If the first search (depth 0) does not complete, return the best root move found so far
+    #   (or the first root move in search order), so that a move is always returned within the budget
+    # - Do not start a deeper search after half of the time limit: it would most likely not complete
+    # - Each search starts with the best move of the previous search (root and transposition table)
+    # - Aspiration windows: search with a window around the previous score;
+    #   if the score falls outside of the window, search again with the window open on that side
+    def SearchIterativeDeepening(self, state, current_player, opposing_player, time_limit=None, node_limit=None):
+        start_time = time.time()
+        self.StartSearch()
+        # Set the search budget
+        if time_limit:
+            self.deadline = start_time + time_limit
+        if node_limit:
+            self.node_limit = node_limit
+
+        best_move  = None
+        best_score = None
+        move       = None
+        for depth in range(self.max_depth + 1):
+            alpha = -INFINITY
+            beta  = INFINITY
+            if best_score is not None and self.aspiration_window and abs(best_score) < MATE_THRESHOLD:
+                alpha = best_score - self.aspiration_window
+                beta  = best_score + self.aspiration_window
+            while True:
+                move, score = self.SearchRoot(state, current_player, opposing_player, depth, alpha, beta, best_move)
+                if self.stop:
+                    break
+                if score <= alpha:
+                    alpha = -INFINITY
+                elif score >= beta:
+                    beta = INFINITY
+                else:
+                    break
+            if self.stop:
+                break
+            best_move  = move
+            best_score = score
+            self.principal_variation = list(self.pv_lines[0])
+            elapsed_time = time.time() - start_time
+            self.iterations.append((depth, best_score, self.nodes, elapsed_time))
+            if self.verbose:
+                print("Depth {0}: evaluation: {1}, nodes: {2}, time: {3:.3f} seconds, principal variation: {4}".format(
+                    depth, self.GetWhiteScore(state, best_score), self.nodes, elapsed_time, self.GetPrincipalVariationNotation()))
+            
+            if time_limit and elapsed_time >= time_limit / 2:
+                break
+            if self.BudgetIsSpent():
+                break
 
+        # The first search did not complete: use the best root move found so far
+        if best_move is None:
+            best_move = move
+            if best_move is None:
+                ordered_moves = self.GetRootMoves(state, current_player, opposing_player)
+                if ordered_moves:
+                    best_move = ordered_moves[0]
+            if best_move is not None:
+                self.principal_variation = [best_move]
+        
+        if self.verbose:
+            if best_score is not None:
+                print("Best evaluation: {0}".format(self.GetWhiteScore(state, best_score)))
+            if best_move:
+                print("Best move: {0}".format(get_move_notation(best_move)))
+                print("Principal variation: {0}".format(self.GetPrincipalVariationNotation()))
+        
         return best_move
 
-    # Get the best move, using alpha-beta pruning
-    # - Use correct current / opposing players
-    # - Use correct starting best evaluations
-    # - Use correct minimizing / maximizing players
-    # - Use alpha-beta pruning
-    def GetBestMoveAlphaBeta(self, state, current_player, opposing_player):
-        best_move = ""
+    # Search the root moves to a depth, using principal variation search (see Negamax)
+    # - Search first_move first (for example, the best move from the previous search)
+    # - Return the best move and its score for the player to move; the result is not valid if the search was stopped
+    # - If the score is outside of the window (alpha, beta), it is only a bound and the best move may not be the best
+    # - Carry alpha from move to move: later moves only need to prove that they are not better
+    # - Save the best line in pv_lines[0]
+    def SearchRoot(self, state, current_player, opposing_player, depth, alpha, beta, first_move=None):
+        best_move   = None
+        best_score  = -INFINITY
+        self.pv_lines[0] = []
         
         # Get legal moves
-        legal_moves = state.GetPlayersLegalMoves(current_player, opposing_player)
-        ordered_moves = self.OrderMoves(state, legal_moves)
+        ordered_moves = self.GetRootMoves(state, current_player, opposing_player, first_move)
+
+        # The game is over: checkmate or stalemate
+        if not ordered_moves:
+            if state.GetGameStatus()["outcome"] == GAME_CHECKMATE:
+                best_score = -MATE_SCORE
+            else:
+                best_score = 0
+            return best_move, best_score
 
-        # Determine if the current player is the maximizing player
-        # Define white as the maximizing player
-        currentPlayerIsMaximizing = state.WhiteToMove()
-        opposingPlayerIsMaximizing = not currentPlayerIsMaximizing
-        
-        # Set starting best evaluations
-        if currentPlayerIsMaximizing:
-            best_eval = float('-inf')
-        else:
-            best_eval = float('inf')
-        
         # Loop over ordered moves
         for move in ordered_moves:
-            position_from, position_to = state.board.GetMovePositions(move)
-            piece_to_move       = state.GetPieceInPosition(position_from)
-            piece_to_capture    = state.GetPieceInPosition(position_to)
-            state.MakeMove(move)
-            eval = self.MinimaxAlphaBeta(state, self.max_depth, float('-inf'), float('inf'), opposingPlayerIsMaximizing)
-            state.UndoMove(move, piece_to_move, piece_to_capture)
+            score = self.SearchRootMove(state, move, depth, alpha, beta, best_move is None)
+            if self.stop:
+                break
 
-            if currentPlayerIsMaximizing:
-                if eval > best_eval:
-                    best_eval = eval
-                    best_move = move
-            else:
-                if eval < best_eval:
-                    best_eval = eval
-                    best_move = move
+            if best_move is None or score > best_score:
+                best_score  = score
+                best_move   = move
+                self.pv_lines[0] = [move] + self.pv_lines[1]
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
 
-        print("Best evaluation: {0}".format(best_eval))
-        print("Best move: {0}".format(best_move))
-        
-        return best_move
+        return best_move, best_score
     
-    # Order moves to improve the efficiency of alpha-beta pruning
-    def OrderMoves(self, state, moves):
-        # pawn promotions (includes captures and checks)
-        promotion_moves = []
-        # captures (includes checks)
-        capture_moves = []
-        # checks (not promotions or captures)
-        check_moves = []
-        # other moves
-        other_moves = []
-        for move in moves:
-            if state.IsPromotion(move):
-                promotion_moves.append(move)
-            elif state.IsCapture(move):
-                capture_moves.append(move)
-            elif state.IsCheck(move):
-                check_moves.append(move)
-            else:
-                other_moves.append(move)
+    # Get the legal moves at the root in search order: first_move first, then the other moves in order
+    def GetRootMoves(self, state, current_player, opposing_player, first_move=None):
+        legal_moves = state.GetGameStatus()["legal_moves"]
+        ordered_moves = self.OrderMoves(state, legal_moves, 0)
+        if first_move in ordered_moves:
+            ordered_moves.remove(first_move)
+            ordered_moves.insert(0, first_move)
+        return ordered_moves
 
-        result = capture_moves + check_moves + other_moves
-        
-        n_result    = len(result)
-        n_moves     = len(moves)
-        
-        # Check that the number of results is equal to the number of moves.
-        if n_result != n_moves:
-            print("ERROR: The number of results {0} is not equal to the number of moves {1}.".format(n_result, n_moves))
+    # Search one root move and return its score for the player to move at the root
+    # - full_window: search with the window (alpha, beta) (first move)
+    # - Otherwise, search with a null window and search again if the move is better (principal variation search)
+    # - The best line after the move is in pv_lines[1]
+    def SearchRootMove(self, state, move, depth, alpha, beta, full_window):
+        state.MakeMove(move)
+        if full_window:
+            score = -self.Negamax(state, depth, -beta, -alpha, 1)
+        else:
+            score = -self.Negamax(state, depth, -alpha - 1, -alpha, 1)
+            if alpha < score < beta and not self.stop:
+                score = -self.Negamax(state, depth, -beta, -alpha, 1)
+        state.UndoMove()
+        return score
 
-        return result
+    # Get a move ordering score: moves with higher scores are searched first
+    # - Pawn promotions (including captures)
+    # - Captures: most valuable victim, then least valuable attacker (MVV-LVA)
+    # - Checks (found without making the move)
+    # - Killer moves for the ply (see SaveCutoffMove)
+    # - Other moves by history score
+    def GetMoveScore(self, state, move, ply):
+        bitboard = state.GetBitboard()
+        if move_is_promotion(move):
+            return ORDER_PROMOTION + abs(bitboard.GetPieceValue(get_move_to(move)))
+        if move_is_capture(move):
+            victim      = abs(bitboard.GetPieceValue(get_move_to(move)))
+            attacker    = abs(bitboard.GetPieceValue(get_move_from(move)))
+            return ORDER_CAPTURE + 10 * victim - attacker
+        if state.IsCheck(move):
+            return ORDER_CHECK
+        ply_killers = self.killers[ply]
+        if move in ply_killers:
+            return ORDER_KILLER + N_KILLERS - ply_killers.index(move)
+        return min(self.history[get_move_from(move)][get_move_to(move)], ORDER_KILLER - 1)
+
+    # Order moves to improve the efficiency of alpha-beta pruning
+    # - Sort by move ordering score; moves with equal scores keep their order
+    def OrderMoves(self, state, moves, ply=0):
+        return sorted(moves, key=lambda move: self.GetMoveScore(state, move, ply), reverse=True)
 
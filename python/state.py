@@ -13,6 +13,18 @@
 # - 6: king
 
 from piece import Pawn, Knight, Bishop, Rook, Queen, King
+from bitboard import Bitboard, get_square, get_xy, get_squares
+from attacks import IN_BETWEEN
+from move import get_move_from, get_move_to, get_move_promotion, move_is_capture, move_is_promotion
+from zobrist import PIECE_KEYS, SIDE_KEY, compute_hash
+
+# Game outcomes for the player to move (see GetGameStatus)
+GAME_ONGOING    = "ongoing"
+GAME_CHECKMATE  = "checkmate"
+GAME_STALEMATE  = "stalemate"
+
+# Maximum number of positions in the game status cache (the cache is cleared when it is full)
+GAME_STATUS_CACHE_SIZE = 10000
 
 # Class to define current game state (piece positions)
 class State:
@@ -21,6 +33,23 @@ class State:
         self.piece_theme = piece_theme
         self.state = None
         self.piece_state = None
+        self.bitboard = Bitboard()
+        # Undo records for moves made: (move, piece to move, piece to capture, hash)
+        self.undo_stack = []
+        # Zobrist hash of the position (see zobrist.py)
+        self.hash = 0
+        # Score of the position (white - black), set by an evaluator (see SetSquareScores)
+        # - square_scores[piece value][square]: score of a piece in a square (white positive, black negative)
+        # - The score is the sum over all pieces, so moving a piece only changes a few terms
+        # Game phase, set by an evaluator (see SetSquareScores)
+        # - phase_values[piece value]: phase value of a piece (for example, more for pieces other than pawns)
+        # - The phase is the sum over all pieces; it only changes with captures and promotions
+        self.square_scores = None
+        self.score = 0
+        self.phase_values = None
+        self.phase = 0
+        # Game status cache: position hash -> game status (see GetGameStatus)
+        self.game_status_cache = {}
         self.white_player = white_player
         self.black_player = black_player
         self.current_player = None
@@ -35,6 +64,15 @@ class State:
             5: "queen",
             6: "king"
         }
+        # Chess piece classes
+        self.piece_classes = {
+            1: Pawn,
+            2: Knight,
+            3: Bishop,
+            4: Rook,
+            5: Queen,
+            6: King
+        }
         # Chess piece images
         # The standard svg files are from this webpage:
         # https://commons.wikimedia.org/wiki/Category:SVG_chess_pieces
@@ -94,11 +132,15 @@ class State:
     def SetPieceState(self, piece_state):
         self.piece_state = piece_state
     
+    def GetBitboard(self):
+        return self.bitboard
+
     def GetCurrentPlayer(self):
         return self.current_player
     
     def SetCurrentPlayer(self, current_player):
         self.current_player = current_player
+        self.UpdateHash()
 
     def GetOpposingPlayer(self):
         return self.opposing_player
@@ -106,6 +148,41 @@ class State:
     def SetOpposingPlayer(self, opposing_player):
         self.opposing_player = opposing_player
 
+    def GetHash(self):
+        return self.hash
+
+    # Compute the hash from scratch; use after changing the position without MakeMove
+    def UpdateHash(self):
+        self.hash = compute_hash(self.bitboard.GetPieceValues(), self.BlackToMove())
+
+    def GetSquareScores(self):
+        return self.square_scores
+
+    # Set the square scores and phase values (from an evaluator) and compute the score and phase from scratch
+    def SetSquareScores(self, square_scores, phase_values=None):
+        self.square_scores = square_scores
+        self.phase_values = phase_values
+        self.UpdateScore()
+
+    # Get the score of the position (white - black); 0 without square scores
+    def GetScore(self):
+        return self.score
+
+    # Get the game phase; 0 without phase values
+    def GetPhase(self):
+        return self.phase
+
+    # Compute the score and phase from scratch; use after changing the position without MakeMove
+    def UpdateScore(self):
+        self.score = 0
+        self.phase = 0
+        for square, value in enumerate(self.bitboard.GetPieceValues()):
+            if value:
+                if self.square_scores:
+                    self.score += self.square_scores[value][square]
+                if self.phase_values:
+                    self.phase += self.phase_values[value]
+
     # Determine if it is white to move
     def WhiteToMove(self):
         return self.current_player == self.white_player
@@ -115,7 +192,9 @@ class State:
         return self.current_player == self.black_player 
 
     # Switch current and opposing players
+    # - The side to move is part of the hash
     def SwitchTurn(self):
+        self.hash ^= SIDE_KEY
         if self.WhiteToMove():
             self.current_player  = self.black_player
             self.opposing_player = self.white_player
@@ -182,16 +261,17 @@ class State:
 
     # Print a detailed game state
     def PrintGameState(self, evaluator=None):
-        current_player_is_in_check      = self.PlayerIsInCheck(self.current_player, self.opposing_player)
-        current_player_is_in_checkmate  = self.PlayerIsInCheckmate(self.current_player, self.opposing_player)
-        current_player_is_in_stalemate  = self.PlayerIsInStalemate(self.current_player, self.opposing_player)
-        game_is_over                    = self.GameIsOver(self.current_player, self.opposing_player)
-        legal_moves                     = self.GetPlayersLegalMoves(self.current_player, self.opposing_player)
+        game_status                     = self.GetGameStatus()
+        current_player_is_in_check      = game_status["in_check"]
+        current_player_is_in_checkmate  = game_status["outcome"] == GAME_CHECKMATE
+        current_player_is_in_stalemate  = game_status["outcome"] == GAME_STALEMATE
+        game_is_over                    = game_status["outcome"] != GAME_ONGOING
+        legal_moves                     = game_status["legal_moves"]
         n_legal_moves                   = len(legal_moves)
         if evaluator:            
             white_total_value = evaluator.GetTotalValue(self, self.white_player)
             black_total_value = evaluator.GetTotalValue(self, self.black_player)
-            evaluation = evaluator.Evaluate(self)
+            evaluation = evaluator.Evaluate(self, current_player_is_in_check, n_legal_moves)
         
         # Print game state information
         #self.PrintState()
@@ -210,7 +290,7 @@ class State:
             print(" - Evaluation:                       {0}".format(evaluation))
         print("------------------------------------------")
 
-    # Set the state based on the piece state
+    # Set the state and bitboard based on the piece state
     def SetStateFromPieceState(self):
         self.SetEmptyState()
         for x in range(8):
@@ -220,6 +300,33 @@ class State:
                     self.state[y][x] = piece.GetValue()
                 else:
                     self.state[y][x] = 0
+        self.bitboard.SetFromState(self.state)
+        self.UpdateHash()
+        self.UpdateScore()
+
+    # Set the state and piece state based on a bitboard
+    def SetStateFromBitboard(self, bitboard):
+        self.SetEmptyPieceState()
+        for y in range(8):
+            for x in range(8):
+                value = bitboard.GetPieceValue(get_square(x, y))
+                if value:
+                    piece_class = self.piece_classes[abs(value)]
+                    piece_color = "white" if value > 0 else "black"
+                    self.PlacePiece(piece_class(piece_color, [x, y]))
+
+    # Set the position: state (8x8 matrix of piece values) and side to move
+    # - Used to rebuild a game state without the pieces objects (for example, from FEN or in another process)
+    def SetPosition(self, state, white_to_move):
+        bitboard = Bitboard()
+        bitboard.SetFromState(state)
+        self.SetStateFromBitboard(bitboard)
+        if white_to_move:
+            self.SetCurrentPlayer(self.white_player)
+            self.SetOpposingPlayer(self.black_player)
+        else:
+            self.SetCurrentPlayer(self.black_player)
+            self.SetOpposingPlayer(self.white_player)
 
     # Set state to an empty board (all entries are 0)
     def SetEmptyState(self):
@@ -227,9 +334,15 @@ class State:
         self.SetState(state)
 
     # Set piece state to a empty board (all entries are None)
+    # The state and bitboard are also cleared so that all three stay in sync
     def SetEmptyPieceState(self):
         piece_state = [[None for x in range(8)] for y in range (8)]
         self.SetPieceState(piece_state)
+        self.SetEmptyState()
+        self.bitboard.Clear()
+        self.undo_stack = []
+        self.UpdateHash()
+        self.UpdateScore()
 
     # Set initial state (starting position)
     def SetInitialState(self):
@@ -302,9 +415,6 @@ class State:
         for piece in black_pieces:
             self.PlacePiece(piece)
 
-        # Set state based on piece state
-        self.SetStateFromPieceState()
-
     # Draw the pieces
     def DrawPieces(self, game, screen, light_color, dark_color, border_color, squares_per_side, square_side):
         # Draw pieces
@@ -348,16 +458,19 @@ class State:
                 
     
     # Place a piece in the piece state
+    # - Also updates the state and bitboard for this square only
     def PlacePiece(self, piece):
         position = piece.GetPosition()
         value = piece.GetValue()
         if self.board.LocationIsValid(position):
             if self.PieceIsValid(value):
-                piece_state = self.GetPieceState()
                 x = position[0]
                 y = position[1]
-                piece_state[y][x] = piece
-                self.SetPieceState(piece_state)
+                self.piece_state[y][x] = piece
+                self.state[y][x] = value
+                self.bitboard.SetPiece(get_square(x, y), value)
+                self.UpdateHash()
+                self.UpdateScore()
             else:
                 print("ERROR: The piece value {0} is not valid!".format(value))
         else:
@@ -380,26 +493,42 @@ class State:
             print("ERROR: The position [x, y] = {0} is not valid!".format(position))
         return
 
-    # Move piece from one position to another
-    def MovePiece(self, move_notation):
-        position_from, position_to = self.board.GetMovePositions(move_notation)
-        x_from, y_from = position_from
-        x_to, y_to     = position_to
-        #print("In MovePiece(): move_notation: {0}".format(move_notation))
-        #print("In MovePiece(): position_from: {0}, position_to: {1}".format(position_from, position_to))
-        
-        # Get piece in "from" position
-        piece = self.GetPieceInPosition(position_from)
-        
-        # Set "from" position to None for empty
-        self.piece_state[y_from][x_from] = None
-        
-        # Set "to" position to piece and update piece position
-        self.piece_state[y_to][x_to] = piece
-        piece.SetPosition(position_to)
+    # Put a piece in a square, or empty the square (piece is None)
+    # - Updates the piece state, state, and bitboard for this square only
+    # - Updates the piece position
+    def SetPieceInSquare(self, square, piece):
+        x = square % 8
+        y = square // 8
+        self.piece_state[y][x] = piece
+        if piece:
+            value = piece.GetValue()
+            piece.SetPosition([x, y])
+            self.state[y][x] = value
+            self.bitboard.SetPiece(square, value)
+        else:
+            self.state[y][x] = 0
+            self.bitboard.RemovePiece(square)
 
-        # Update state based on piece state
-        self.SetStateFromPieceState()
+    # Get piece object in square (None: empty)
+    def GetPieceInSquare(self, square):
+        return self.piece_state[square // 8][square % 8]
+
+    # Move piece from one position to another
+    # - The move is a packed move (see move.py)
+    # - Does not apply pawn promotion or switch players; see MakeMove
+    def MovePiece(self, move):
+        square_from = get_move_from(move)
+        square_to   = get_move_to(move)
+        #print("In MovePiece(): move: {0}".format(move))
+        
+        # Get piece in "from" square
+        piece = self.GetPieceInSquare(square_from)
+        
+        # Set "from" square to empty, and set "to" square to piece
+        self.SetPieceInSquare(square_from, None)
+        self.SetPieceInSquare(square_to, piece)
+        self.UpdateHash()
+        self.UpdateScore()
 
     # Pawn promotion
     # - For now, always promote pawns to queens
@@ -421,55 +550,108 @@ class State:
                 print("Promoting the {0} at {1} to a queen!".format(piece_name, piece_position))
                 new_piece = Queen(piece_color, piece_position)
                 self.PlacePiece(new_piece)
-                self.SetStateFromPieceState()
 
     # Make move
-    # - Move piece
-    # - Promote pawn if applicable
+    # - Save an undo record (move, piece to move, piece to capture, hash) on the undo stack
+    # - Move piece; only the "from" and "to" squares are updated
+    # - Promote pawn if applicable (the promotion piece is part of the move)
+    # - Update the hash and the score for the changed squares
     # - Switch current and opposing players
     def MakeMove(self, move):
-        # Get move positions
-        position_from, position_to = self.board.GetMovePositions(move)
-        # Get piece to move
-        piece_to_move = self.GetPieceInPosition(position_from)
-        # Move piece
-        self.MovePiece(move)
+        square_from = get_move_from(move)
+        square_to   = get_move_to(move)
+        # Get piece to move and piece to capture (None: empty)
+        piece_to_move       = self.GetPieceInSquare(square_from)
+        piece_to_capture    = self.GetPieceInSquare(square_to)
+        self.undo_stack.append((move, piece_to_move, piece_to_capture, self.hash))
+        # Remove piece to move and piece to capture from the hash, the score, and the phase
+        square_scores = self.square_scores
+        phase_values  = self.phase_values
+        value_from = piece_to_move.GetValue()
+        self.hash ^= PIECE_KEYS[value_from][square_from]
+        if square_scores:
+            self.score -= square_scores[value_from][square_from]
+        if piece_to_capture:
+            value_to = piece_to_capture.GetValue()
+            self.hash ^= PIECE_KEYS[value_to][square_to]
+            if square_scores:
+                self.score -= square_scores[value_to][square_to]
+            if phase_values:
+                self.phase -= phase_values[value_to]
         # Promote pawn if applicable
-        self.PromotePawn(piece_to_move)
+        promotion = get_move_promotion(move)
+        if promotion:
+            piece_class = self.piece_classes[promotion]
+            piece_to_move = piece_class(piece_to_move.GetColor(), get_xy(square_to))
+        # Move piece
+        self.SetPieceInSquare(square_from, None)
+        self.SetPieceInSquare(square_to, piece_to_move)
+        # Add moved (or promoted) piece to the hash, the score, and the phase
+        value_moved = piece_to_move.GetValue()
+        self.hash ^= PIECE_KEYS[value_moved][square_to]
+        if square_scores:
+            self.score += square_scores[value_moved][square_to]
+        if promotion and phase_values:
+            self.phase += phase_values[value_moved] - phase_values[value_from]
         # Switch current and opposing players
         self.SwitchTurn()
     
-    # Undo move
-    # - Place original piece to move (to undo pawn promotion)
-    # - Reverse move
-    # - Place piece to capture
-    # - Update state
+    # Undo the last move made
+    # - Pop the undo record from the undo stack
+    # - Put the piece to capture (or empty) back in the "to" square
+    # - Put the original piece to move back in the "from" square (undoes pawn promotion)
     # - Switch current and opposing players
-    def UndoMove(self, move, piece_to_move, piece_to_capture):
-        # Get reverse move
-        reverse_move = self.board.GetReverseMove(move)
-        # Place original piece to move (to undo pawn promotion)
-        self.PlacePiece(piece_to_move)
-        self.SetStateFromPieceState()
-        # Reverse move
-        self.MovePiece(reverse_move)
-        # If there was a piece to capture, put it back
-        if piece_to_capture:
-            self.PlacePiece(piece_to_capture)
-            self.SetStateFromPieceState()
+    # - Restore the hash
+    # - Update the score and phase for the changed squares (the square scores may have been set after the move was made)
+    def UndoMove(self):
+        move, piece_to_move, piece_to_capture, previous_hash = self.undo_stack.pop()
+        square_from = get_move_from(move)
+        square_to   = get_move_to(move)
+        square_scores = self.square_scores
+        phase_values  = self.phase_values
+        if square_scores or phase_values:
+            value_moved = self.GetPieceInSquare(square_to).GetValue()
+            value_from  = piece_to_move.GetValue()
+            if square_scores:
+                self.score -= square_scores[value_moved][square_to]
+                self.score += square_scores[value_from][square_from]
+                if piece_to_capture:
+                    self.score += square_scores[piece_to_capture.GetValue()][square_to]
+            if phase_values:
+                self.phase += phase_values[value_from] - phase_values[value_moved]
+                if piece_to_capture:
+                    self.phase += phase_values[piece_to_capture.GetValue()]
+        self.SetPieceInSquare(square_to, piece_to_capture)
+        self.SetPieceInSquare(square_from, piece_to_move)
         # Switch current and opposing players
         self.SwitchTurn()
+        self.hash = previous_hash
+
+    # Make a null move: pass the turn to the opponent without moving (used by null-move pruning)
+    # - Only the side to move (and the hash) changes
+    def MakeNullMove(self):
+        self.SwitchTurn()
+
+    # Undo a null move
+    def UndoNullMove(self):
+        self.SwitchTurn()
+
+    # Determine if a player has pieces other than pawns and the king
+    # - Without them, passing is often better than any move (zugzwang)
+    def PlayerHasNonPawnPieces(self, player):
+        player_color = player.GetColor()
+        for piece_value in range(2, 6):
+            if self.bitboard.GetPieces(player_color, piece_value):
+                return True
+        return False
 
     # Check if at least one piece occupies a square between two positions
+    # - Use the precomputed in between squares and the occupancy bitboard
     def PieceIsInBetween(self, position_1, position_2):
-        result = False
-        # Get in between squares
-        in_between_squares = self.board.GetInBetweenSquares(position_1, position_2)
-        for square in in_between_squares:
-            # Check if there is a piece on this square
-            piece = self.GetPieceInPosition(square)            
-            if piece:
-                result = True
+        x_1, y_1 = position_1
+        x_2, y_2 = position_2
+        in_between_squares = IN_BETWEEN[get_square(x_1, y_1)][get_square(x_2, y_2)]
+        result = bool(in_between_squares & self.bitboard.GetAllOccupancy())
         return result
     
     # Determine if move is valid
@@ -483,80 +665,49 @@ class State:
     # - Pawns cannot move diagonally, but can capture diagonally
     
     # Get possible moves for a piece
+    # - Targets come from the attack tables and rays (see Bitboard.GetPieceTargets)
     def GetPiecePossibleMoves(self, piece):
-        all_moves       = []
-        valid_moves     = []
-        valid_captures  = []
+        all_moves = []
 
-        position_from = piece.GetPosition()
-        
         # Only check for moves if the piece exists
         if piece:
-            piece_color = piece.GetColor()
-            piece_type  = piece.GetType()
-            valid_moves = piece.GetValidMoves()
-
-            for position_to in valid_moves:
-                piece_of_opposite_color = False
-                square_is_empty         = False
-                # Piece to capture
-                piece_to_capture = self.GetPieceInPosition(position_to)
-                if piece_to_capture:
-                    piece_to_capture_color  = piece_to_capture.GetColor()
-                    piece_of_opposite_color = (piece_color != piece_to_capture_color)
-                else:
-                    square_is_empty = True
-                # Check if a piece occupies a square in between two positions
-                piece_is_in_between = self.PieceIsInBetween(position_from, position_to)
-                
-                if square_is_empty or piece_of_opposite_color:
-                    # Pawn movement: pawns can only move to empty squares
-                    if piece_type == "pawn":
-                        if square_is_empty and not piece_is_in_between:
-                            all_moves.append(position_to)
-                    # Knights can jump over pieces
-                    elif piece_type == "knight":
-                        all_moves.append(position_to)
-                    # Other piece cannot jump over pieces
-                    else:
-                        if not piece_is_in_between:
-                            all_moves.append(position_to)
-            
-            # Include pawn captures
-            if piece_type == "pawn":
-                valid_captures = piece.GetValidCaptures()
-                for position_to in valid_captures:
-                    piece_of_opposite_color = False
-                    # Piece to capture
-                    piece_to_capture = self.GetPieceInPosition(position_to)
-                    # Check if a piece occupies a square in between two positions
-                    piece_is_in_between = self.PieceIsInBetween(position_from, position_to)
-                    if piece_to_capture:
-                        piece_to_capture_color  = piece_to_capture.GetColor()
-                        piece_of_opposite_color = (piece_color != piece_to_capture_color)
-                        # Pawn capture: pawns can only capture pieces of opposite color
-                        if piece_of_opposite_color and not piece_is_in_between:
-                            all_moves.append(position_to)
+            x_from, y_from  = piece.GetPosition()
+            square_from     = get_square(x_from, y_from)
+            targets         = self.bitboard.GetPieceTargets(square_from)
+            for square_to in get_squares(targets):
+                all_moves.append(get_xy(square_to))
         
         return all_moves
     
-    # Get legal moves for a piece
-    def GetPieceLegalMoves(self, piece, player, opponent):
+    # Get legal moves for a piece of the player to move
+    # - Uses the cached legal moves of the position (see GetGameStatus), so drawing the moves each frame does not generate moves
+    # - Only pieces of the player to move have moves: a piece of the opposing player gets no moves
+    def GetPieceLegalMoves(self, piece):
         legal_moves = []
-        position_from = piece.GetPosition()
-        possible_moves = self.GetPiecePossibleMoves(piece)
-        for position_to in possible_moves:
-            move_notation = self.board.GetMoveNotation(position_from, position_to)
-            # Determine if a player's move would put himself in check
-            move_results_in_check = self.MoveResultsInCheck(player, opponent, move_notation)
-            if not move_results_in_check:
-                legal_moves.append(position_to)
+        x_from, y_from  = piece.GetPosition()
+        square_from     = get_square(x_from, y_from)
+        for move in self.GetGameStatus()["legal_moves"]:
+            if get_move_from(move) == square_from:
+                legal_moves.append(get_xy(get_move_to(move)))
         return legal_moves
 
+    # Get the current player's legal move from one position to another (None if the move is not legal)
+    # - Used to convert a move chosen on the board (clicked squares) to a packed move
+    def GetMoveFromPositions(self, position_from, position_to):
+        x_from, y_from  = position_from
+        x_to, y_to      = position_to
+        square_from     = get_square(x_from, y_from)
+        square_to       = get_square(x_to, y_to)
+        for move in self.GetGameStatus()["legal_moves"]:
+            if get_move_from(move) == square_from and get_move_to(move) == square_to:
+                return move
+        return None
+
     # Draw legal moves for a piece based on its position; include captures
-    def DrawMovesForPiece(self, primary_color, xy_position, player, opponent):
+    # - Only the moves of the player to move are drawn (see GetPieceLegalMoves)
+    def DrawMovesForPiece(self, primary_color, xy_position):
         piece = self.GetPieceInPosition(xy_position)
-        piece_moves = self.GetPieceLegalMoves(piece, player, opponent)
+        piece_moves = self.GetPieceLegalMoves(piece)
         for move in piece_moves:
             square_position = self.board.GetSquarePosition(move)
             square_x, square_y = square_position
@@ -569,213 +720,127 @@ class State:
             self.board.DrawCircle(primary_color, center_x, center_y, radius)
 
     # Get a list of all of a player's pieces
+    # - Only visit occupied squares using the player's occupancy bitboard
     def GetPlayersPieces(self, player_color):
         pieces = []
-        for x in range(8):
-            for y in range(8):
-                piece = self.piece_state[y][x]
-                if piece:
-                    piece_color = piece.GetColor()
-                    # Check if piece color is the same as player color
-                    if piece_color == player_color:
-                        pieces.append(piece)
+        occupancy = self.bitboard.GetOccupancy(player_color)
+        for square in get_squares(occupancy):
+            pieces.append(self.piece_state[square // 8][square % 8])
         return pieces
     
     # Get all possible moves for a player
-    # Move contains both "from" and "to" locations
-    # Format for move: "<from>_<to>" using x, y or chess notation; for example, "46_44" or "e2_e4"
+    # Each move is a packed move (see move.py) containing both "from" and "to" squares
     def GetPlayersPossibleMoves(self, player):
-        player_moves = []
         player_color = player.GetColor()
-        pieces = self.GetPlayersPieces(player_color)
-        # Loop over all pieces for a player
-        for piece in pieces:            
-            position_from = piece.GetPosition()
-            # Get possible moves for piece
-            piece_moves = self.GetPiecePossibleMoves(piece)
-            for position_to in piece_moves:
-                move_notation = self.board.GetMoveNotation(position_from, position_to)
-                player_moves.append(move_notation)
+        player_moves = self.bitboard.GetPossibleMoves(player_color)
         return player_moves
     
     # Get all legal moves for a player
-    # Move contains both "from" and "to" locations
-    # Format for move: "<from>_<to>" using x, y or chess notation; for example, "46_44" or "e2_e4"
+    # Each move is a packed move (see move.py) containing both "from" and "to" squares
+    # - Checkers and pinned pieces are found once; only legal moves are generated
     def GetPlayersLegalMoves(self, player, opponent):
-        player_moves = []
         player_color = player.GetColor()
-        pieces = self.GetPlayersPieces(player_color)
-        # Loop over all pieces for a player
-        for piece in pieces:            
-            position_from = piece.GetPosition()
-            # Get legal moves for piece
-            piece_moves = self.GetPieceLegalMoves(piece, player, opponent)
-            for position_to in piece_moves:
-                move_notation = self.board.GetMoveNotation(position_from, position_to)
-                player_moves.append(move_notation)
+        player_moves = self.bitboard.GetLegalMoves(player_color)
         return player_moves
     
+    # Get all legal captures and pawn promotions for a player (subset of legal moves)
+    # - Only captures and promotions are generated (used by quiescence search)
+    def GetPlayersLegalCapturesAndPromotions(self, player, opponent):
+        player_color = player.GetColor()
+        player_moves = self.bitboard.GetLegalMoves(player_color, captures_only=True)
+        return player_moves
+
     # Get all legal captures for a player (subset of legal moves)
     def GetPlayersLegalCaptures(self, player, opponent):
         captures = []
-        moves = self.GetPlayersLegalMoves(player, opponent)
+        moves = self.GetPlayersLegalCapturesAndPromotions(player, opponent)
         for move in moves:
-            # position_from, position_to = self.board.GetMovePositions(move)
-            # piece_to_capture = self.GetPieceInPosition(position_to)
-            # # Check if there is a piece to capture
-            # if piece_to_capture:
-            #     captures.append(move)
-            if self.IsCapture(move):
+            if move_is_capture(move):
                 captures.append(move)
         return captures
 
     # Determine if a move is a pawn promotion; assume the move is a legal move
     def IsPromotion(self, move):
-        position_from, position_to = self.board.GetMovePositions(move)
-        target_x, target_y = self.board.GetPositionXY(position_to)
-        piece_to_move = self.GetPieceInPosition(position_from)
-        
-        piece_color     = piece_to_move.GetColor()
-        piece_type      = piece_to_move.GetType()
-        
-        # The final row is based on the color
-        final_row = {"white": 0, "black": 7}
-
-        if piece_type == "pawn" and target_y == final_row[piece_color]:
-            return True
-        else:
-            return False
+        return move_is_promotion(move)
 
     # Determine if a move is a capture; assume the move is a legal move
     def IsCapture(self, move):
-        position_from, position_to = self.board.GetMovePositions(move)
-        piece_to_capture = self.GetPieceInPosition(position_to)
-        # Check if there is a piece to capture
-        if piece_to_capture:
-            return True
-        else:
-            return False
+        return move_is_capture(move)
         
     # Determine if a move put the opponent in check; assume the move is a legal move
+    # - Use the bitboards to find direct and discovered checks without making the move
     def IsCheck(self, move):
-        current_player  = self.GetCurrentPlayer()
-        opposing_player = self.GetOpposingPlayer()
-        position_from, position_to = self.board.GetMovePositions(move)
-        piece_to_move       = self.GetPieceInPosition(position_from)
-        piece_to_capture    = self.GetPieceInPosition(position_to)
-        
-        self.MakeMove(move)
-        result = self.PlayerIsInCheck(opposing_player, current_player)
-        self.UndoMove(move, piece_to_move, piece_to_capture)
-        
-        return result
+        return self.bitboard.MoveGivesCheck(move)
 
     # Get position of player's king
+    # - The king square is tracked by the bitboard; no search is needed
     def GetPlayersKingPosition(self, player):
         king_position = []
         player_color    = player.GetColor()
-        player_pieces   = self.GetPlayersPieces(player_color)
-        for piece in player_pieces:
-            piece_type = piece.GetType()
-            if piece_type == "king":
-                king_position = piece.GetPosition()
-                # Return now to speed up
-                return king_position
-        
+        king_square     = self.bitboard.GetKingSquare(player_color)
+        if king_square is not None:
+            king_position = get_xy(king_square)
         return king_position
 
+    # Determine if a square (position [x, y]) is attacked by a player's pieces (color)
+    # - Looks outward from the square using the attack tables and rays
+    # - Pinned pieces still attack squares
+    def IsSquareAttacked(self, position, by_color):
+        x, y = position
+        return self.bitboard.IsSquareAttacked(get_square(x, y), by_color)
+
     # Define check!
     # - The player's king is under attack
     # - Pinned pieces (pinned to a king) can still deliver check
     def PlayerIsInCheck(self, player, opponent):
         result = False
-        king_position = self.GetPlayersKingPosition(player)
-        king_position_string = self.board.GetPositionString(king_position)
-        # Get opponent's possible moves (not legal moves); pinned pieces still apply check!
-        opponent_possible_moves = self.GetPlayersPossibleMoves(opponent)
-
-        # Loop over opponent's possible moves and captures
-        for move in opponent_possible_moves:
-            split_move = move.split("_")
-            move_start, move_end = split_move
-            # Determine if opponent can capture the player's king
-            if move_end == king_position_string:
-                result = True
-                # Return now to speed up
-                return result
-
+        king_square = self.bitboard.GetKingSquare(player.GetColor())
+        if king_square is not None:
+            result = self.bitboard.IsSquareAttacked(king_square, opponent.GetColor())
         return result
     
-    # Define checkmate!!
-    # - Player is in check
-    # - Player has no legal moves
-    def PlayerIsInCheckmate(self, player, opponent):
-        result = False
-        
-        player_is_in_check = self.PlayerIsInCheck(player, opponent)
-        legal_moves = self.GetPlayersLegalMoves(player, opponent)
-        n_legal_moves = len(legal_moves)
-        
-        if player_is_in_check and n_legal_moves == 0:
-            result = True
-        
-        return result
-    
-    # Define stalemate...
-    # - Player is not in check
-    # - Player has not legal moves
-    def PlayerIsInStalemate(self, player, opponent):
-        result = False
-
-        player_is_in_check = self.PlayerIsInCheck(player, opponent)
-        legal_moves = self.GetPlayersLegalMoves(player, opponent)
-        n_legal_moves = len(legal_moves)
-
-        if not player_is_in_check and n_legal_moves == 0:
-            result = True
-
-        return result
-    
-    # Define game over conditions.
-    def GameIsOver(self, player, opponent):
-        result = False
-        
-        if self.PlayerIsInCheckmate(player, opponent):
-            result = True
-        
-        if self.PlayerIsInStalemate(player, opponent):
-            result = True
-        
-        return result
+    # Get the game status for the player to move: dictionary with
+    # - "in_check": the player to move is in check
+    # - "legal_moves": the legal moves of the player to move (do not change this list; it is cached)
+    # - "outcome": GAME_CHECKMATE (in check, no legal moves), GAME_STALEMATE (not in check, no legal moves), or GAME_ONGOING
+    # - Check and the legal moves are found once per position and cached by position hash
+    def GetGameStatus(self):
+        game_status = self.game_status_cache.get(self.hash)
+        if game_status is None:
+            in_check    = self.PlayerIsInCheck(self.current_player, self.opposing_player)
+            legal_moves = self.GetPlayersLegalMoves(self.current_player, self.opposing_player)
+            outcome     = GAME_ONGOING
+            if not legal_moves:
+                outcome = GAME_CHECKMATE if in_check else GAME_STALEMATE
+            game_status = {
+                "in_check"      : in_check,
+                "legal_moves"   : legal_moves,
+                "outcome"       : outcome
+            }
+            if len(self.game_status_cache) >= GAME_STATUS_CACHE_SIZE:
+                self.game_status_cache.clear()
+            self.game_status_cache[self.hash] = game_status
+        return game_status
+
+    # Determine if the game is over for the player to move (checkmate or stalemate)
+    def GameIsOver(self):
+        return self.GetGameStatus()["outcome"] != GAME_ONGOING
 
     # Determine if a player's move would put himself in check
-    # - Get piece to capture (if any).
-    # - Move piece (updates state and piece state).
+    # - Make move (the undo record keeps the piece to capture, if any).
     # - After move, check if player is in check.
-    # - Move piece back to original position (updates state and piece state).
-    # - If there was a piece to capture for this move, put it back and update state.
-    # - Does not apply pawn promotion; this should be ok...
-    # FIXME: update with MakeMove and UndoMove functions
-    def MoveResultsInCheck(self, player, opponent, move_notation):
+    # - Undo move.
+    def MoveResultsInCheck(self, player, opponent, move):
         result = False
-        reverse_move = self.board.GetReverseMove(move_notation)
-        position_from, position_to = self.board.GetMovePositions(move_notation)
-
-        # Piece to capture
-        piece_to_capture = self.GetPieceInPosition(position_to)
         
-        # Move piece to test new game state
-        self.MovePiece(move_notation)
+        # Make move to test new game state
+        self.MakeMove(move)
         
         # Determine if player is now in check after move
         result = self.PlayerIsInCheck(player, opponent)
 
-        # Reverse move
-        self.MovePiece(reverse_move)
-        # If there was a piece to capture, put it back
-        if piece_to_capture:
-            self.PlacePiece(piece_to_capture)
-            self.SetStateFromPieceState()
+        # Undo move
+        self.UndoMove()
         
         return result
 
@@ -21,6 +21,17 @@ class PieceTable:
             [ 5, 10, 10,-20,-20, 10, 10,  5],
             [ 0,  0,  0,  0,  0,  0,  0,  0]
         ]
+        # Pawn end game table: pawns are worth more the closer they are to promotion
+        self.pawn_end_game_table = [
+            [ 0,  0,  0,  0,  0,  0,  0,  0],
+            [80, 80, 80, 80, 80, 80, 80, 80],
+            [50, 50, 50, 50, 50, 50, 50, 50],
+            [30, 30, 30, 30, 30, 30, 30, 30],
+            [20, 20, 20, 20, 20, 20, 20, 20],
+            [10, 10, 10, 10, 10, 10, 10, 10],
+            [ 0,  0,  0,  0,  0,  0,  0,  0],
+            [ 0,  0,  0,  0,  0,  0,  0,  0]
+        ]
         # Knight table
         self.knight_table = [
             [-50,-40,-30,-30,-30,-30,-40,-50],
@@ -90,6 +101,7 @@ class PieceTable:
         # Dictionary of tables
         self.tables = {
             "pawn"              : self.pawn_table,
+            "pawn_end_game"     : self.pawn_end_game_table,
             "knight"            : self.knight_table,
             "bishop"            : self.bishop_table,
             "rook"              : self.rook_table,
@@ -111,6 +123,33 @@ class PieceTable:
             print("ERROR: The table name '{0}' was not found.".format(table_name))
         return result
 
+    # Get a table as a flat list of 64 values for a color (index: square = 8 * y + x)
+    # - Tables are written for white; for black, flip the table over the central horizontal axis
+    def GetFlatTable(self, table_name, color):
+        table = self.GetTable(table_name)
+        flat_table = []
+        for square in range(64):
+            # Note: index with y first (row), then x (column)
+            row     = square // 8
+            column  = square % 8
+            if color == "black":
+                row = 7 - row
+            flat_table.append(table[row][column])
+        return flat_table
+
+    # Get flat tables combined with material values: dictionary color -> piece type -> list of 64 values
+    # - piece_values: material value for each piece type
+    # - table_names: table name for each piece type (for example, the middle game or the end game king table)
+    # - Values are for the piece's own color (black values are mirrored, but not negated)
+    def GetPieceSquareValues(self, piece_values, table_names):
+        result = {}
+        for color in ["white", "black"]:
+            result[color] = {}
+            for piece_type, table_name in table_names.items():
+                flat_table = self.GetFlatTable(table_name, color)
+                result[color][piece_type] = [piece_values[piece_type] + value for value in flat_table]
+        return result
+
     # Plot tables
     def PlotTables(self, plot_dir):
         tables = self.GetTables()
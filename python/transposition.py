@@ -0,0 +1,94 @@
+# Transposition table class
+
+# Save search results by position hash (see zobrist.py)
+# - The number of buckets is set by a memory budget in MB
+# - Each bucket has two entries:
+#   - depth-preferred: only replaced by a search that is at least as deep, or by a newer search
+#   - always-replace: replaced by every search that does not go in the depth-preferred entry
+# - Each entry is a tuple: (hash, depth, score, bound, best move, age)
+# - Bound types:
+#   - exact: the score is the value of the position
+#   - lower bound: the value is at least the score (the search failed high)
+#   - upper bound: the value is at most the score (the search failed low)
+
+EXACT       = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Approximate size of one entry in bytes (tuple, its items, and a list slot)
+ENTRY_SIZE = 200
+
+class TranspositionTable:
+    def __init__(self, size_mb=16):
+        self.size_mb    = size_mb
+        self.n_buckets  = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_SIZE))
+        self.depth_preferred_entries    = None
+        self.always_replace_entries     = None
+        self.age        = 0
+        self.probes     = 0
+        self.hits       = 0
+        self.stores     = 0
+        self.Clear()
+
+    # Remove all entries
+    def Clear(self):
+        self.depth_preferred_entries    = [None for i in range(self.n_buckets)]
+        self.always_replace_entries     = [None for i in range(self.n_buckets)]
+        self.age = 0
+        self.ResetCounters()
+
+    def GetSizeMB(self):
+        return self.size_mb
+
+    def GetNumberOfBuckets(self):
+        return self.n_buckets
+
+    # Start a new search: entries from older searches can be replaced first
+    def NewSearch(self):
+        self.age += 1
+
+    def ResetCounters(self):
+        self.probes = 0
+        self.hits   = 0
+        self.stores = 0
+
+    def GetCounters(self):
+        return {"probes": self.probes, "hits": self.hits, "stores": self.stores}
+
+    # Get the entry for a position hash (None if the position is not in the table)
+    def Probe(self, hash_key):
+        self.probes += 1
+        index = hash_key % self.n_buckets
+        entry = self.depth_preferred_entries[index]
+        if entry and entry[0] == hash_key:
+            self.hits += 1
+            return entry
+        entry = self.always_replace_entries[index]
+        if entry and entry[0] == hash_key:
+            self.hits += 1
+            return entry
+        return None
+
+    # Get the best move saved for a position hash (None if there is no entry or no move)
+    def GetBestMove(self, hash_key):
+        index = hash_key % self.n_buckets
+        for entry in (self.depth_preferred_entries[index], self.always_replace_entries[index]):
+            if entry and entry[0] == hash_key:
+                return entry[4]
+        return None
+
+    # Save a search result
+    # - Use the depth-preferred entry if it is empty, from an older search, or not deeper than this search
+    # - Otherwise, use the always-replace entry
+    def Store(self, hash_key, depth, score, bound, best_move):
+        self.stores += 1
+        index = hash_key % self.n_buckets
+        new_entry = (hash_key, depth, score, bound, best_move, self.age)
+        entry = self.depth_preferred_entries[index]
+        if not entry or entry[5] != self.age or depth >= entry[1]:
+            # Keep the best move of the same position if this search did not find one
+            if entry and entry[0] == hash_key and best_move is None:
+                new_entry = (hash_key, depth, score, bound, entry[4], self.age)
+            self.depth_preferred_entries[index] = new_entry
+        else:
+            self.always_replace_entries[index] = new_entry
@@ -0,0 +1,36 @@
+# Zobrist keys
+
+# Hash a position with one 64-bit integer
+# - One random key for each piece value and square
+# - One random key for side to move (xor when black is to move)
+# - The hash of a position is the xor of the keys for all pieces, and the side key if black is to move
+# - Moving a piece only changes a few keys, so the hash can be updated incrementally
+# - Castling and en passant rights do not exist yet; add keys for them here when they do
+# - Keys use a fixed seed, so every run (and every process) gets the same hashes
+
+import random
+
+ZOBRIST_SEED = 2024
+
+# Build keys for each piece value (white positive, black negative) and square
+def build_piece_keys(rng):
+    piece_keys = {}
+    for value in range(-6, 7):
+        if value:
+            piece_keys[value] = [rng.getrandbits(64) for square in range(64)]
+    return piece_keys
+
+zobrist_rng = random.Random(ZOBRIST_SEED)
+PIECE_KEYS  = build_piece_keys(zobrist_rng)
+SIDE_KEY    = zobrist_rng.getrandbits(64)
+
+# Compute the hash of a position from scratch
+# - squares: piece value for each square (0: empty)
+def compute_hash(squares, black_to_move):
+    result = 0
+    for square, value in enumerate(squares):
+        if value:
+            result ^= PIECE_KEYS[value][square]
+    if black_to_move:
+        result ^= SIDE_KEY
+    return result